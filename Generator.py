@@ -1,6 +1,59 @@
 import random
 from collections import deque
 
+# compact per-cell view codes shared by the GUIs: 0-8 are revealed numbers
+COVERED = 9
+FLAGGED = 10
+MINE = 11  # revealed bomb
+
+# (width, height, bomb_count) of the standard board sizes
+BOARD_PRESETS = {
+    'small': (10, 10, 15),
+    'beginner': (9, 9, 10),
+    'intermediate': (16, 16, 40),
+    'expert': (30, 16, 99),
+}
+
+
+def neighbor_indices(i, width, height):
+    # row-major indices of the up to 8 neighbours of cell index i
+    x, y = i % width, i // width
+    for dy in (-1, 0, 1):
+        ny = y + dy
+        if 0 <= ny < height:
+            for dx in (-1, 0, 1):
+                nx = x + dx
+                if (dx or dy) and 0 <= nx < width:
+                    yield ny * width + nx
+
+
+def new_seed():
+    return random.getrandbits(64)
+
+
+def mine_indices(width, height, bomb_count, first_selection, seed):
+    """Row-major indices of the bombs of the board a seed stands for.
+
+    The seed shuffles every cell once; the bombs are the first bomb_count cells of that order
+    outside the 3x3 block around the first click, so the same seed keeps the same layout
+    (except near the click) whatever cell is clicked first.
+    """
+    fx, fy = first_selection
+    block = (min(width, fx + 2) - max(0, fx - 1)) * (min(height, fy + 2) - max(0, fy - 1))
+    if bomb_count > width * height - block:
+        raise ValueError("too many bombs for the board size")
+    if bomb_count == 0:
+        return []
+    order = list(range(width * height))
+    random.Random(seed).shuffle(order)
+    mines = []
+    for i in order:
+        if abs(i % width - fx) <= 1 and abs(i // width - fy) <= 1:
+            continue
+        mines.append(i)
+        if len(mines) == bomb_count:
+            return mines
+
 
 class Cell:
     def __init__(self, board, x, y):
@@ -12,6 +65,10 @@ class Cell:
         self.isFlagged = False
         self.revealed = False
 
+    def __hash__(self):
+        # by position, not id, so sets of cells (and the solver's runs) are the same every time
+        return self.y * self.board.width + self.x
+
     """the decorator @property makes the next method’s output a
     property of the object, which is assigned only when needed 
     and updates dynamically"""
@@ -30,13 +87,21 @@ class Cell:
     def isNumber(self):
             return self.revealed and not self.isBomb
 
+    @property
+    def code(self):
+        # what the player sees on this cell, as a view code
+        if self.revealed:
+            return MINE if self.isBomb else self.num
+        return FLAGGED if self.isFlagged else COVERED
+
 
 class Board:
-    def __init__(self, width, height, bomb_count, first_selection):
+    def __init__(self, width, height, bomb_count, first_selection, seed=None):
         self.width = width
         self.height = height
         self.bomb_count = bomb_count
         self.first_selection = first_selection
+        self.seed = new_seed() if seed is None else seed  # the same seed gives the same bombs
         self.grid = [
             [Cell(self, x, y) for x in range(width)]
             for y in range(height)
@@ -58,27 +123,14 @@ class Board:
     def place_bombs(self, first_selection):
         fx, fy = first_selection
 
-        # Build the list of positions where bombs could be placed
-        candidates = []
-
-        for y in range(self.height):
-            for x in range(self.width):
-
-                # Skip the first selection itself
-                # Skip neighbors of the first click and reveal them
-                if (x, y) == (fx, fy) or (abs(x - fx) <= 1 and abs(y - fy) <= 1):
-                    # reveal the first selection and neighbours
-                    self.grid[y][x].revealed = True
-                    continue
-
-                candidates.append((x, y))
-
-        # Randomly select bomb positions
-        bomb_positions = random.sample(candidates, self.bomb_count)
+        # reveal the first selection and its neighbours, bombs never go there
+        for y in range(max(0, fy - 1), min(self.height, fy + 2)):
+            for x in range(max(0, fx - 1), min(self.width, fx + 2)):
+                self.grid[y][x].revealed = True
 
         # Mark the cells as bombs
-        for (x, y) in bomb_positions:
-            self.grid[y][x].isBomb = True
+        for i in mine_indices(self.width, self.height, self.bomb_count, first_selection, self.seed):
+            self.grid[i // self.width][i % self.width].isBomb = True
 
     def _initial_zero_expand(self):
         q = deque()
@@ -113,6 +165,42 @@ class Board:
                     q.append(n)
 
     
+    def covered_copy(self):
+        # a board with the same bombs but every cell covered and unflagged
+        other = Board.__new__(Board)
+        other.width = self.width
+        other.height = self.height
+        other.bomb_count = self.bomb_count
+        other.first_selection = self.first_selection
+        other.seed = self.seed
+        other.grid = [
+            [Cell(other, x, y) for x in range(self.width)]
+            for y in range(self.height)
+        ]
+        for row, other_row in zip(self.grid, other.grid):
+            for c, o in zip(row, other_row):
+                o.isBomb = c.isBomb
+        return other
+
+    def metrics(self, solver=True):
+        """Difficulty metrics: {'3bv', 'openings', 'opening_sizes'} and, with solver,
+        'solver_steps' (analyses until the Solver stops) and 'solved' (finished without guessing)"""
+        import boardMetrics  # imported here, boardMetrics needs this module
+        from bitBoard import BitLayout
+        layout = BitLayout(self.width, self.height)
+        bombs = layout.from_indices(c.y * self.width + c.x for row in self.grid for c in row if c.isBomb)
+        sizes, bbbv = boardMetrics.label_openings(layout, bombs)[0]
+        result = boardMetrics.metrics_dict(sizes, bbbv)
+        if solver:
+            # on a fresh copy, this board keeps its state
+            fresh = Board(self.width, self.height, self.bomb_count, self.first_selection, self.seed)
+            result['solver_steps'], result['solved'] = boardMetrics.solver_steps(fresh)
+        return result
+
+    def view_codes(self):
+        # row-major view codes of the whole board (index = y * width + x)
+        return bytearray(c.code for row in self.grid for c in row)
+
     def print_board(self, show_bombs=False):
         for y in range(self.height):
             row = []
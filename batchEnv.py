@@ -0,0 +1,115 @@
+from generator import COVERED, FLAGGED, MINE, mine_indices, new_seed
+from gameSession import PLAYING, WON, LOST
+from bitBoard import BitLayout
+
+
+class BatchEnv:
+     """K games of the same size stepped in lock-step, for batch agents.
+
+     Bombs, revealed and flagged cells of all boards are each one packed int (see BitLayout) and
+     the bomb counts are 4 bit-sliced planes, so reveal/flag, flood fill and the win/loss checks
+     are a handful of bitwise operations over the whole batch. Boards come from the same seeds
+     and generator.mine_indices as Board and GameSession, so every board plays exactly like a
+     single game with the same seed and first click.
+     """
+     def __init__(self, width, height, bomb_count, boards, seeds=None, first=None):
+          self.width = width
+          self.height = height
+          self.bomb_count = bomb_count
+          self.boards = boards
+          self.layout = BitLayout(width, height, boards)
+          self.reset(seeds, first)
+
+     def reset(self, seeds=None, first=None):
+          """New boards (seeds: one per board, None = random); every board opens first, default the centre.
+          Returns the statuses."""
+          L = self.layout
+          self.seeds = list(seeds) if seeds is not None else [new_seed() for _ in range(self.boards)]
+          self.first = first if first is not None else (self.width // 2, self.height // 2)
+          self.bombs = L.from_positions(L.position(k, i) for k, seed in enumerate(self.seeds)
+                                        for i in mine_indices(self.width, self.height, self.bomb_count,
+                                                              self.first, seed))
+          self.safe = L.cells & ~self.bombs
+          self.counts = L.neighbor_counts(self.bombs)
+          self.zeros = self.safe & ~(self.counts[0] | self.counts[1] | self.counts[2] | self.counts[3])
+          self.revealed = 0
+          self.flagged = 0
+          self.exploded = 0  # bombs revealed by losing moves
+          self.status = [PLAYING] * self.boards
+          self.active = L.cells  # cells of the boards still playing
+
+          # the first click opens its 3x3 block, like Board.place_bombs
+          fx, fy = self.first
+          block = [y * self.width + x for y in range(max(0, fy - 1), min(self.height, fy + 2))
+                   for x in range(max(0, fx - 1), min(self.width, fx + 2))]
+          self.open(L.replicate(L.from_indices(block)))
+          return self.status
+
+     def action_mask(self, actions):
+          # one row-major cell index per board (None or negative = no move), restricted to live boards
+          L = self.layout
+          return L.from_positions(L.position(k, i) for k, i in enumerate(actions)
+                                  if i is not None and i >= 0) & self.active
+
+     def reveal(self, actions):
+          """Reveal one cell per board (actions[k]: row-major index or None); returns the statuses"""
+          clicks = self.action_mask(actions) & ~self.revealed & ~self.flagged
+          hits = clicks & self.bombs
+          if hits:
+               self.exploded |= hits
+               self.finish(self.layout.boards_with_bits(hits), LOST)
+          self.open(clicks & self.safe & self.active)
+          return self.status
+
+     def flag(self, actions):
+          """Toggle a flag on one covered cell per board; returns the statuses"""
+          self.flagged ^= self.action_mask(actions) & ~self.revealed
+          return self.status
+
+     def open(self, seeds):
+          # flood from seeds on every board at once, then check which boards are won
+          opened = self.layout.flood(seeds, self.safe & ~self.revealed, self.zeros)
+          if not opened:
+               return
+          self.revealed |= opened
+          self.flagged &= ~opened  # flags on cells a zero opened were wrong
+          left = self.layout.boards_with_bits(self.safe & ~self.revealed & self.active)
+          won = [self.status[k] == PLAYING and not left[k] for k in range(self.boards)]
+          if any(won):
+               self.finish(won, WON)
+
+     def finish(self, which, status):
+          for k, done in enumerate(which):
+               if done and self.status[k] == PLAYING:
+                    self.status[k] = status
+          self.active = self.layout.replicate(self.layout.board_cells, [s == PLAYING for s in self.status])
+
+     # ---- observations
+
+     def view(self, k):
+          """Board k as a bytearray of view codes (index = y * width + x), like GameSession.view"""
+          L = self.layout
+          bits = {name: format(L.board(mask, k), f'0{L.stride}b')[::-1]
+                  for name, mask in (('revealed', self.revealed), ('flagged', self.flagged),
+                                     ('exploded', self.exploded), ('c0', self.counts[0]),
+                                     ('c1', self.counts[1]), ('c2', self.counts[2]), ('c3', self.counts[3]))}
+          codes = bytearray([COVERED]) * (self.width * self.height)
+          i = 0
+          for y in range(self.height):
+               p = y * L.row
+               for x in range(self.width):
+                    if bits['exploded'][p] == '1':
+                         codes[i] = MINE
+                    elif bits['revealed'][p] == '1':
+                         codes[i] = (int(bits['c0'][p]) | int(bits['c1'][p]) << 1
+                                     | int(bits['c2'][p]) << 2 | int(bits['c3'][p]) << 3)
+                    elif bits['flagged'][p] == '1':
+                         codes[i] = FLAGGED
+                    p += 1
+                    i += 1
+          return codes
+
+     def covered(self, k):
+          """Row-major indices of the covered, unflagged cells of board k"""
+          L = self.layout
+          return L.indices(L.board(L.cells & ~self.revealed & ~self.flagged & ~self.exploded, k))
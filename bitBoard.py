@@ -0,0 +1,126 @@
+class BitLayout:
+     """Bit positions of `boards` boards of width x height packed in one Python int.
+
+     Cell (x, y) of board k is bit k * stride + y * row + x, with row = width + 1: the spare bit
+     at the end of every row and the spare row under every board are always zero, so shifting a
+     mask by one cell never carries into the next row or board. stride is a whole number of
+     bytes, so board k is bytes k * stride // 8 onwards of to_bytes(). Bitwise operations on
+     these ints then work on every cell of every board at once.
+     """
+     def __init__(self, width, height, boards=1):
+          self.width = width
+          self.height = height
+          self.boards = boards
+          self.row = width + 1
+          self.stride = ((height + 1) * self.row + 7) // 8 * 8
+          self.nbytes = self.stride // 8 * boards
+
+          row_bits = (1 << width) - 1
+          self.board_cells = 0  # the cells of one board
+          for y in range(height):
+               self.board_cells |= row_bits << (y * self.row)
+          self.cells = self.replicate(self.board_cells)
+          # neighbour offsets in bits
+          self.offsets = (1, self.row - 1, self.row, self.row + 1)
+
+     # ---- conversions
+
+     def replicate(self, mask, which=None):
+          """The one-board mask copied to every board (or to the boards k with which[k] true)"""
+          chunk = mask.to_bytes(self.stride // 8, 'little')
+          if which is None:
+               return int.from_bytes(chunk * self.boards, 'little')
+          empty = bytes(len(chunk))
+          return int.from_bytes(b''.join(chunk if w else empty for w in which), 'little')
+
+     def position(self, k, i):
+          # bit of row-major cell index i (y * width + x) of board k
+          return k * self.stride + (i // self.width) * self.row + i % self.width
+
+     def from_positions(self, positions):
+          """Mask with the given bit positions set (fast for many bits)"""
+          buf = bytearray(self.nbytes)
+          for p in positions:
+               buf[p >> 3] |= 1 << (p & 7)
+          return int.from_bytes(buf, 'little')
+
+     def from_indices(self, indices):
+          # one-board mask of row-major cell indices
+          mask = 0
+          for i in indices:
+               mask |= 1 << ((i // self.width) * self.row + i % self.width)
+          return mask
+
+     def board(self, mask, k):
+          """The bits of board k, shifted down to a one-board mask"""
+          return (mask >> (k * self.stride)) & self.board_cells
+
+     def boards_with_bits(self, mask):
+          """List of bools: does board k have any bit set in mask"""
+          data = mask.to_bytes(self.nbytes, 'little')
+          size = self.stride // 8
+          empty = bytes(size)
+          return [data[k * size:(k + 1) * size] != empty for k in range(self.boards)]
+
+     def split(self, mask):
+          """One one-board mask per board (cheaper than board() for every k)"""
+          data = mask.to_bytes(self.nbytes, 'little')
+          size = self.stride // 8
+          return [int.from_bytes(data[k * size:(k + 1) * size], 'little') for k in range(self.boards)]
+
+     def indices(self, mask):
+          """Row-major cell indices set in a one-board mask"""
+          out = []
+          row = self.row
+          while mask:
+               low = mask & -mask
+               p = low.bit_length() - 1
+               out.append((p // row) * self.width + p % row)
+               mask ^= low
+          return out
+
+     # ---- whole-batch operations
+
+     def dilate(self, mask):
+          """mask plus every neighbour of its cells"""
+          m = mask | (mask << 1) | (mask >> 1)
+          m |= (m << self.row) | (m >> self.row)
+          return m & self.cells
+
+     def neighbor_masks(self, mask):
+          # the 8 shifted copies of mask: bit p of each is set if that neighbour of p is in mask
+          for d in self.offsets:
+               yield mask << d
+               yield mask >> d
+
+     def neighbor_counts(self, mask):
+          """Bit-sliced count of the neighbours in mask: 4 planes, count = sum(plane[i] << i)"""
+          planes = [0, 0, 0, 0]
+          for shifted in self.neighbor_masks(mask):
+               carry = shifted
+               for i in range(4):
+                    planes[i], carry = planes[i] ^ carry, planes[i] & carry
+                    if not carry:
+                         break
+          return [p & self.cells for p in planes]
+
+     def count_equals(self, planes, value):
+          """Mask of the cells whose bit-sliced count is value"""
+          m = self.cells
+          for i, p in enumerate(planes):
+               m &= p if value >> i & 1 else ~p
+          return m
+
+     def flood(self, seeds, open_cells, zeros):
+          """Open seeds and, through zero cells, everything connected to them.
+
+          open_cells: cells that may be opened (the safe cells); zeros: cells with no bomb around.
+          All boards are expanded together, one ring per loop.
+          """
+          opened = seeds & open_cells
+          frontier = opened & zeros
+          while frontier:
+               grown = self.dilate(frontier) & open_cells & ~opened
+               opened |= grown
+               frontier = grown & zeros
+          return opened
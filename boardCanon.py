@@ -0,0 +1,83 @@
+from hashlib import blake2b
+
+from generator import FLAGGED, MINE
+
+# a board state is (width, height, bombs, revealed, flagged): each mask is a row-major bytes
+# string of b'0'/b'1', one byte per cell, so the 8 symmetries are plain slicing
+
+_BITS = b'01' + bytes(254)  # 0 -> b'0', 1 -> b'1'
+_REVEALED = b''.join(b'1' if code <= 8 or code == MINE else b'0' for code in range(256))
+_FLAGGED = b''.join(b'1' if code == FLAGGED else b'0' for code in range(256))
+
+
+def view_state(width, height, mines, view):
+     """State from a 0/1 bomb bytearray and a bytearray of view codes (GameSession.mines/view)"""
+     view = bytes(view)
+     return width, height, bytes(mines).translate(_BITS), view.translate(_REVEALED), view.translate(_FLAGGED)
+
+
+def session_state(session):
+     # before the first click (READY) no bomb is placed yet: an all-zero bomb mask
+     mines = session.mines if session.mines is not None else bytes(session.width * session.height)
+     return view_state(session.width, session.height, mines, session.view)
+
+
+def layout_state(layout, bombs, revealed=0, flagged=0):
+     """State from one-board masks of a BitLayout"""
+     w, row = layout.width, layout.row
+
+     def rows(mask):
+          bits = format(mask, f'0{layout.stride}b')[::-1]
+          return ''.join(bits[y * row:y * row + w] for y in range(layout.height)).encode()
+     return w, layout.height, rows(bombs), rows(revealed), rows(flagged)
+
+
+def flip_x(s, width, height):
+     return b''.join(s[y * width:(y + 1) * width][::-1] for y in range(height))
+
+
+def flip_y(s, width, height):
+     return b''.join(s[y * width:(y + 1) * width] for y in range(height - 1, -1, -1))
+
+
+def transpose(s, width, height):
+     # column x becomes row x
+     return b''.join(s[x::width] for x in range(width))
+
+
+def symmetries(state):
+     """The 8 rotations/reflections of a state (4 keep the size, 4 swap width and height)"""
+     width, height = state[0], state[1]
+     masks = state[2:]
+     for w, h, ms in ((width, height, masks), (height, width, tuple(transpose(m, width, height) for m in masks))):
+          yield (w, h) + ms
+          yield (w, h) + tuple(flip_x(m, w, h) for m in ms)
+          yield (w, h) + tuple(flip_y(m, w, h) for m in ms)
+          yield (w, h) + tuple(m[::-1] for m in ms)
+
+
+def canonical(state):
+     """The smallest of the 8 symmetric forms of a state, the same for all of them"""
+     return min(symmetries(state))
+
+
+def state_hash(state):
+     """Stable 64-bit hash of the canonical form (the same in every process and run)"""
+     width, height, bombs, revealed, flagged = canonical(state)
+     h = blake2b(f"{width}x{height}:".encode(), digest_size=8)
+     h.update(bombs)
+     h.update(revealed)
+     h.update(flagged)
+     return int.from_bytes(h.digest(), 'little')
+
+
+def dedupe(states):
+     """Indices of the first state of every symmetry class"""
+     seen = set()
+     keep = []
+     for k, state in enumerate(states):
+          key = canonical(state)
+          if key not in seen:
+               seen.add(key)
+               keep.append(k)
+     return keep
@@ -0,0 +1,93 @@
+from generator import Board, mine_indices
+from bitBoard import BitLayout
+from solverCore import Solver
+from solverProbability import CSPSolver
+from solverPatterns import PatternSolver
+
+
+def label_openings(layout, bombs):
+     """Openings and 3BV of every board packed in layout, from their bomb mask.
+
+     An opening is a connected group of zero cells plus the numbers around it. All boards are
+     labelled together: each round floods the lowest unlabelled zero of every board at once, so
+     the number of rounds is the largest opening count, not the number of cells.
+     Returns per board (opening sizes, 3BV).
+     """
+     L = layout
+     safe = L.cells & ~bombs
+     counts = L.neighbor_counts(bombs)
+     zeros = safe & ~(counts[0] | counts[1] | counts[2] | counts[3])
+
+     sizes = [[] for _ in range(L.boards)]
+     unlabelled = zeros
+     while unlabelled:
+          seeds = []
+          for k, part in enumerate(L.split(unlabelled)):
+               if part:
+                    seeds.append(k * L.stride + (part & -part).bit_length() - 1)
+          opening = L.flood(L.from_positions(seeds), safe, zeros)
+          for k, part in enumerate(L.split(opening)):
+               if part:
+                    sizes[k].append(part.bit_count())
+          unlabelled &= ~opening
+
+     # numbers touching no zero need a click each
+     isolated = L.split(safe & ~L.dilate(zeros))
+     return [(sizes[k], len(sizes[k]) + isolated[k].bit_count()) for k in range(L.boards)]
+
+
+def solver_steps(board):
+     """(analyses until the Solver stops, whether it finished the board) on a fresh Board"""
+     solver = Solver(board)
+     solver.initialize()
+     steps = 0
+     while solver.step():
+          steps += 1
+     safe_cells = board.width * board.height - board.bomb_count
+     return steps, sum(c.revealed for row in board.grid for c in row) == safe_cells
+
+
+def metrics_dict(sizes, bbbv):
+     return {'3bv': bbbv, 'openings': len(sizes), 'opening_sizes': sizes}
+
+
+def score_boards(width, height, bomb_count, seeds, first=None, solver=False):
+     """Difficulty metrics of many seeded boards at once (see Board.metrics).
+
+     solver=True also runs the Solver on every board ('solver_steps', 'solved'); that part
+     builds each Board and is much slower than the labelling.
+     """
+     if first is None:
+          first = (width // 2, height // 2)
+     seeds = list(seeds)
+     layout = BitLayout(width, height, len(seeds))
+     bombs = layout.from_positions(layout.position(k, i) for k, seed in enumerate(seeds)
+                                   for i in mine_indices(width, height, bomb_count, first, seed))
+     scores = [metrics_dict(sizes, bbbv) for sizes, bbbv in label_openings(layout, bombs)]
+     if solver:
+          for score, seed in zip(scores, seeds):
+               score['solver_steps'], score['solved'] = solver_steps(Board(width, height, bomb_count, first, seed))
+     return scores
+
+
+# solver tiers, cheapest first: the rules alone, the rules plus the pattern table, the rules plus
+# exact enumeration and the mine-count endgame, or guessing needed
+TIERS = ('rules', 'patterns', 'csp', 'guess')
+
+
+def solver_tier(width, height, bomb_count, first, seed):
+     """(lowest tier that finishes the seeded board, cells deduced by that tier's solver).
+
+     For 'guess' the deductions are the ones the csp tier made before it got stuck.
+     """
+     for tier, solver_cls in (('rules', Solver), ('patterns', PatternSolver), ('csp', CSPSolver)):
+          board = Board(width, height, bomb_count, first, seed)
+          opened = sum(c.revealed for row in board.grid for c in row)
+          solver = solver_cls(board)
+          solver.initialize()
+          solver.run()
+          revealed = sum(c.revealed for row in board.grid for c in row)
+          deductions = revealed - opened + sum(c.isFlagged for row in board.grid for c in row)
+          if revealed == width * height - bomb_count:
+               return tier, deductions
+     return 'guess', deductions
@@ -0,0 +1,351 @@
+from PyQt6.QtWidgets import QWidget, QScrollArea
+from PyQt6.QtGui import QPainter, QFont, QImage, QColor
+from PyQt6.QtCore import Qt, QRect, QRectF, pyqtSignal
+
+import resources
+from generator import COVERED, FLAGGED, MINE
+
+
+NUMBER_COLORS = {
+     1: '#0000ff', 2: '#008000', 3: '#ff0000',
+     4: '#000080', 5: '#800000', 6: '#008080',
+     7: '#000000', 8: '#808080'
+}
+
+
+# below this cell size the board is drawn from the one-pixel-per-cell overview image
+DETAIL_MIN_SIZE = 10
+MIN_ZOOM = 2
+MAX_ZOOM = 64
+
+
+def fit_cell_size(width, height, max_size=50, min_size=12):
+     """Largest cell size (px) that keeps a width x height board on a normal screen"""
+     return max(min_size, min(max_size, 1200 // width, 720 // height))
+
+
+def heat_colors(steps=20):
+     # green (safe) -> red (mine), translucent so the cell image shows through
+     colors = []
+     for k in range(steps + 1):
+          t = k / steps
+          colors.append(QColor(int(255 * t), int(200 * (1 - t)), 0, 150))
+     return colors
+
+
+HEAT_COLORS = heat_colors()
+
+
+def overview_palette():
+     # colour table of the overview image, indexed by view code
+     base = QColor('#d4d4d4')
+     table = [base.rgb()]
+     for n in range(1, 9):
+          c = QColor(NUMBER_COLORS[n])
+          # revealed numbers: grey tinted towards the number colour
+          table.append(QColor((base.red() * 2 + c.red()) // 3, (base.green() * 2 + c.green()) // 3,
+                              (base.blue() * 2 + c.blue()) // 3).rgb())
+     table.append(QColor('#8a8a8a').rgb())  # COVERED
+     table.append(QColor('#ffcc00').rgb())  # FLAGGED
+     table.append(QColor('#ff4444').rgb())  # MINE
+     return table
+
+
+class BoardWidget(QWidget):
+     """Draws the whole board in a single paintEvent instead of one QPushButton per cell.
+
+     The board is a row-major bytearray of view codes (see generator COVERED/FLAGGED/MINE),
+     clicks are mapped to cells by dividing the mouse position by the cell size.
+     """
+     cellClicked = pyqtSignal(int, int)
+     cellRightClicked = pyqtSignal(int, int)
+     cellMiddleClicked = pyqtSignal(int, int)
+     codesChanged = pyqtSignal(object)  # list of changed indices, or None for the whole board
+
+     def __init__(self, width, height, cell_size=40, parent=None):
+          super().__init__(parent)
+          self.cell_size = cell_size
+          self.set_board_size(width, height)
+
+     def set_board_size(self, width, height, cell_size=None):
+          self.board_width = width
+          self.board_height = height
+          self.codes = bytearray([COVERED]) * (width * height)
+          self.highlight = None  # (x, y) of the highlighted cell, if any
+          self.heat = None       # (dict index -> mine probability, probability of other covered cells)
+          self.rebuild_overview()
+          self.set_cell_size(cell_size or self.cell_size)
+          self.codesChanged.emit(None)
+
+     def set_cell_size(self, cell_size):
+          self.cell_size = cell_size
+          self.setFixedSize(self.board_width * cell_size, self.board_height * cell_size)
+
+          # images come from the shared cache, scaled once per size
+          s = cell_size
+          self.scaled_cell = resources.pixmap('preview.png', s, s)
+          self.scaled_mine = resources.pixmap('Icon.png', int(s * 0.8), int(s * 0.8), keep_aspect=True)
+          self.cell_font = QFont()
+          self.cell_font.setBold(True)
+          self.cell_font.setPixelSize(max(8, int(s * 0.45)))
+          self.heat_font = QFont()
+          self.heat_font.setPixelSize(max(6, int(s * 0.3)))
+          self.update()
+
+     def set_heat(self, heat):
+          """Overlay mine probabilities on covered cells (None hides the overlay)"""
+          self.heat = heat
+          self.update()
+
+     def rebuild_overview(self):
+          # one pixel per cell, pixel value = view code; used by the minimap and for zoomed-out painting
+          w, h = self.board_width, self.board_height
+          self.overview = QImage(bytes(self.codes), w, h, w, QImage.Format.Format_Indexed8).copy()
+          self.overview.setColorTable(overview_palette())
+
+     def set_codes(self, codes, highlight=None):
+          self.codes[:] = codes
+          self.highlight = highlight
+          self.rebuild_overview()
+          self.update()
+          self.codesChanged.emit(None)
+
+     # ---- dirty-cell updates: only the rects of cells that changed are repainted
+
+     def cell_rect(self, x, y):
+          s = self.cell_size
+          return QRect(x * s, y * s, s, s)
+
+     def set_cells(self, changes):
+          """Apply (index, code) pairs and schedule one repaint covering the cells that changed"""
+          w = self.board_width
+          codes = self.codes
+          overview = self.overview
+          changed = []
+          x0 = y0 = 1 << 30
+          x1 = y1 = -1
+          for i, code in changes:
+               if codes[i] != code:
+                    codes[i] = code
+                    x, y = i % w, i // w
+                    overview.setPixel(x, y, code)
+                    changed.append(i)
+                    x0, x1 = min(x0, x), max(x1, x)
+                    y0, y1 = min(y0, y), max(y1, y)
+          if changed:
+               # a single bounding rect: a cascade of thousands of cells is still one update
+               s = self.cell_size
+               self.update(QRect(x0 * s, y0 * s, (x1 - x0 + 1) * s, (y1 - y0 + 1) * s))
+               self.codesChanged.emit(changed)
+
+     def set_highlight(self, highlight):
+          if highlight == self.highlight:
+               return
+          if self.highlight is not None:
+               self.update(self.cell_rect(*self.highlight))
+          self.highlight = highlight
+          if highlight is not None:
+               self.update(self.cell_rect(*highlight))
+
+     # ---- painting
+
+     def paintEvent(self, event):
+          s = self.cell_size
+          rect = event.rect()
+          x0 = max(0, rect.left() // s)
+          y0 = max(0, rect.top() // s)
+          x1 = min(self.board_width - 1, rect.right() // s)
+          y1 = min(self.board_height - 1, rect.bottom() // s)
+
+          painter = QPainter(self)
+          if s < DETAIL_MIN_SIZE:
+               # zoomed far out: scale the overview image, cost depends on the viewport only
+               src = QRect(x0, y0, x1 - x0 + 1, y1 - y0 + 1)
+               painter.drawImage(QRect(x0 * s, y0 * s, src.width() * s, src.height() * s), self.overview, src)
+               if self.highlight is not None:
+                    self.draw_border(painter, self.cell_rect(*self.highlight), '#00aa00', 1)
+               painter.end()
+               return
+
+          painter.setFont(self.cell_font)
+          for y in range(y0, y1 + 1):
+               row = y * self.board_width
+               for x in range(x0, x1 + 1):
+                    self.paint_cell(painter, x, y, self.codes[row + x], self.highlight == (x, y))
+          painter.end()
+
+     def paint_cell(self, painter, x, y, code, highlighted):
+          s = self.cell_size
+          r = QRect(x * s, y * s, s, s)
+
+          if code == COVERED:
+               if self.scaled_cell is not None:
+                    painter.drawPixmap(r, self.scaled_cell)
+               else:
+                    painter.fillRect(r, resources.color('#bdbdbd'))
+               if self.heat is not None:
+                    self.paint_heat(painter, r, x, y)
+               if highlighted:
+                    self.draw_border(painter, r, '#00aa00', 3)
+          elif code == FLAGGED:
+               painter.fillRect(r, resources.color('#ffaa00' if highlighted else '#ffcc00'))
+               self.draw_border(painter, r, '#ff8800', 2)
+               painter.drawText(r, Qt.AlignmentFlag.AlignCenter, '🚩')
+          elif code == MINE:
+               painter.fillRect(r, resources.color('#ff4444'))
+               self.draw_border(painter, r, '#888', 1)
+               if self.scaled_mine is not None:
+                    px = r.x() + (s - self.scaled_mine.width()) // 2
+                    py = r.y() + (s - self.scaled_mine.height()) // 2
+                    painter.drawPixmap(px, py, self.scaled_mine)
+          else:  # revealed number
+               painter.fillRect(r, resources.color('#b0e0b0' if highlighted else '#d4d4d4'))
+               if highlighted:
+                    self.draw_border(painter, r, '#00aa00', 3)
+               else:
+                    self.draw_border(painter, r, '#888', 1)
+               if code:
+                    painter.setPen(resources.color(NUMBER_COLORS.get(code, '#000000')))
+                    painter.drawText(r, Qt.AlignmentFlag.AlignCenter, str(code))
+
+     def paint_heat(self, painter, r, x, y):
+          probs, interior = self.heat
+          p = probs.get(y * self.board_width + x, interior)
+          painter.fillRect(r, HEAT_COLORS[round(p * (len(HEAT_COLORS) - 1))])
+          if self.cell_size >= 30:
+               painter.setFont(self.heat_font)
+               painter.setPen(resources.color('#000000'))
+               painter.drawText(r, Qt.AlignmentFlag.AlignCenter, f"{p * 100:.0f}%")
+               painter.setFont(self.cell_font)
+
+     def draw_border(self, painter, r, color, width):
+          painter.setPen(resources.pen(color, width))
+          half = width // 2
+          painter.drawRect(r.adjusted(half, half, -half - 1, -half - 1))
+
+     # ---- input
+
+     def cell_at(self, pos):
+          x = int(pos.x()) // self.cell_size
+          y = int(pos.y()) // self.cell_size
+          if 0 <= x < self.board_width and 0 <= y < self.board_height:
+               return x, y
+          return None
+
+     def mousePressEvent(self, event):
+          if event.button() == Qt.MouseButton.RightButton:
+               cell = self.cell_at(event.position())
+               if cell is not None:
+                    self.cellRightClicked.emit(*cell)
+               event.accept()
+               return
+          super().mousePressEvent(event)
+
+     def mouseReleaseEvent(self, event):
+          if event.button() in (Qt.MouseButton.LeftButton, Qt.MouseButton.MiddleButton):
+               cell = self.cell_at(event.position())
+               if cell is not None:
+                    if event.button() == Qt.MouseButton.LeftButton:
+                         self.cellClicked.emit(*cell)
+                    else:
+                         self.cellMiddleClicked.emit(*cell)
+               event.accept()
+               return
+          super().mouseReleaseEvent(event)
+
+
+class BoardView(QScrollArea):
+     """Scrollable, zoomable BoardWidget; only the cells inside the viewport are ever painted.
+
+     Ctrl + mouse wheel zooms around the cursor. `minimap` is a separate widget the GUI can place.
+     """
+     def __init__(self, width, height, cell_size=40, parent=None):
+          super().__init__(parent)
+          self.board = BoardWidget(width, height, cell_size)
+          self.setWidget(self.board)
+          self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+          self.minimap = MiniMap(self)
+          self.fit_to_board()
+
+     def fit_to_board(self):
+          # as big as the board needs, but no bigger than a normal screen
+          frame = 2 * self.frameWidth() + 2
+          self.setMinimumSize(min(self.board.width() + frame, 1200), min(self.board.height() + frame, 720))
+          # (never show() it here: the GUI has not parented it yet)
+          if not (self.board.width() > 1200 or self.board.height() > 720
+                  or self.board.board_width > 64 or self.board.board_height > 64):
+               self.minimap.hide()
+
+     def wheelEvent(self, event):
+          if event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+               step = 1 if event.angleDelta().y() > 0 else -1
+               self.zoom(step, event.position())
+               event.accept()
+               return
+          super().wheelEvent(event)
+
+     def zoom(self, step, anchor):
+          """Change the cell size by ~20% per step, keeping the cell under `anchor` (viewport pos) in place"""
+          old = self.board.cell_size
+          new = max(MIN_ZOOM, min(MAX_ZOOM, old + step * max(1, old // 5)))
+          if new == old:
+               return
+          hbar, vbar = self.horizontalScrollBar(), self.verticalScrollBar()
+          bx = (hbar.value() + anchor.x()) / old
+          by = (vbar.value() + anchor.y()) / old
+          self.board.set_cell_size(new)
+          hbar.setValue(int(bx * new - anchor.x()))
+          vbar.setValue(int(by * new - anchor.y()))
+          self.minimap.update()
+
+     def center_on(self, fx, fy):
+          # fx, fy: fractions of the board width/height
+          hbar, vbar = self.horizontalScrollBar(), self.verticalScrollBar()
+          hbar.setValue(int(fx * self.board.width() - self.viewport().width() / 2))
+          vbar.setValue(int(fy * self.board.height() - self.viewport().height() / 2))
+
+
+class MiniMap(QWidget):
+     """Low-resolution picture of the whole board with the visible viewport outlined; click to jump"""
+     SIZE = 200
+
+     def __init__(self, view):
+          super().__init__()
+          self.view = view
+          self.setFixedSize(self.SIZE, self.SIZE)
+          view.board.codesChanged.connect(self.update)
+          view.horizontalScrollBar().valueChanged.connect(self.update)
+          view.verticalScrollBar().valueChanged.connect(self.update)
+
+     def image_rect(self):
+          # the board keeps its aspect ratio inside the square widget
+          board = self.view.board
+          scale = min(self.width() / board.board_width, self.height() / board.board_height)
+          w, h = board.board_width * scale, board.board_height * scale
+          return QRectF((self.width() - w) / 2, (self.height() - h) / 2, w, h)
+
+     def paintEvent(self, event):
+          board = self.view.board
+          target = self.image_rect()
+          painter = QPainter(self)
+          painter.drawImage(target, board.overview)
+
+          # visible part of the board
+          sx = target.width() / board.width()
+          sy = target.height() / board.height()
+          vp = self.view.viewport()
+          painter.setPen(resources.pen('#00aa00', 2))
+          painter.drawRect(QRectF(target.x() + self.view.horizontalScrollBar().value() * sx,
+                                  target.y() + self.view.verticalScrollBar().value() * sy,
+                                  min(vp.width(), board.width()) * sx, min(vp.height(), board.height()) * sy))
+          painter.end()
+
+     def mousePressEvent(self, event):
+          self.jump(event.position())
+
+     def mouseMoveEvent(self, event):
+          self.jump(event.position())
+
+     def jump(self, pos):
+          target = self.image_rect()
+          self.view.center_on((pos.x() - target.x()) / target.width(), (pos.y() - target.y()) / target.height())
@@ -0,0 +1,266 @@
+import argparse
+import glob
+import os
+import random
+import time
+from math import sqrt
+from multiprocessing import Event, Pool, cpu_count, util
+from statistics import NormalDist
+
+from generator import Board, BOARD_PRESETS
+from solverCore import Solver
+from solverProbability import ProbabilityEngine, CSPSolver, ComponentCache, SHAPE_CACHE
+from solverPatterns import PatternSolver
+
+# solver classes the bots can use
+SOLVERS = {
+     'rules': Solver,     # single/multi-cell rules only
+     'patterns': PatternSolver,  # rules plus the local pattern table
+     'csp': CSPSolver,    # rules plus exact enumeration of the frontier
+}
+
+
+def wilson_interval(wins, games, z=1.96):
+     """(low, high) Wilson score interval of a win rate"""
+     if games == 0:
+          return 0.0, 1.0
+     p = wins / games
+     denom = 1 + z * z / games
+     center = (p + z * z / (2 * games)) / denom
+     half = z * sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denom
+     return max(0.0, center - half), min(1.0, center + half)
+
+
+def pick_guess(board, engine, rng):
+     # the covered cell least likely to be a bomb (a random one if engine is None)
+     if engine is None:
+          return rng.choice([c for row in board.grid for c in row if c.isUnknown])
+     probs, interior_p = engine.update(board.view_codes())
+     best = min(probs, key=probs.get, default=None)
+     if best is None or interior_p < probs[best]:
+          interior = [c for row in board.grid for c in row
+                      if c.isUnknown and c.y * board.width + c.x not in probs]
+          if interior:
+               return rng.choice(interior)
+     return board.grid[best // board.width][best % board.width]
+
+
+# component cache file of this worker process (see init_worker), None = not kept
+worker_cache = None
+worker_games = 0
+stop_event = None  # set by run_arena on an early stop: the games still queued return None at once
+SHARD_EVERY = 50  # games between two saves of a worker's shard
+
+
+def shard_path(path, pid):
+     return f"{path}.shard{pid}"
+
+
+def save_shard():
+     SHAPE_CACHE.save(shard_path(worker_cache, os.getpid()))
+
+
+def init_worker(cache_path, stop=None):
+     """Pool initializer: start from the saved component cache. The worker writes what it learns
+     to its own shard file, merged into cache_path by merge_shards at the end of the run."""
+     global worker_cache, stop_event
+     worker_cache = cache_path
+     stop_event = stop
+     if cache_path is not None:
+          if os.path.exists(cache_path):
+               SHAPE_CACHE.load(cache_path)
+          util.Finalize(None, save_shard, exitpriority=10)  # last shard, when the pool closes
+
+
+def merge_shards(path):
+     # fold the worker shards into path; returns the number of cached shapes
+     cache = ComponentCache(SHAPE_CACHE.limit)
+     if os.path.exists(path):
+          cache.load(path)
+     shards = glob.glob(glob.escape(path) + '.shard*')
+     for shard in shards:
+          cache.load(shard)
+     tmp = path + '.tmp'
+     cache.save(tmp)
+     os.replace(tmp, path)
+     for shard in shards:
+          os.remove(shard)
+     return len(cache.entries)
+
+
+def play_game(args):
+     """One bot game: the solver runs to a fixpoint, then guesses until it wins or hits a bomb.
+     Returns (won, guesses, seconds, solver rule_stats, component cache hits, misses), or None
+     once the arena has stopped early. Module-level so it runs in the worker processes."""
+     global worker_games
+     if stop_event is not None and stop_event.is_set():
+          return None
+     hits, misses = SHAPE_CACHE.hits, SHAPE_CACHE.misses
+     result = play_board(*args)
+     worker_games += 1
+     if worker_cache is not None and worker_games % SHARD_EVERY == 0:
+          save_shard()
+     return result + (SHAPE_CACHE.hits - hits, SHAPE_CACHE.misses - misses)
+
+
+def play_board(width, height, bomb_count, first, seed, solver_name, guess):
+     # (won, guesses, seconds, rule_stats) of one game
+     start = time.perf_counter()
+     board = Board(width, height, bomb_count, first, seed)
+     solver = SOLVERS[solver_name](board)
+     engine = ProbabilityEngine(width, height, bomb_count) if guess == 'safest' else None
+     rng = random.Random(seed)
+     safe_cells = width * height - bomb_count
+
+     solver.initialize()
+     guesses = 0
+     while True:
+          solver.run()
+          if sum(c.revealed for row in board.grid for c in row) == safe_cells:
+               return True, guesses, time.perf_counter() - start, solver.rule_stats
+          cell = pick_guess(board, engine, rng)
+          guesses += 1
+          if cell.isBomb:
+               return False, guesses, time.perf_counter() - start, solver.rule_stats
+          solver.revealCell(cell)
+
+
+class ArenaStats:
+     def __init__(self, z):
+          self.z = z
+          self.games = 0
+          self.wins = 0
+          self.guesses = 0
+          self.seconds = 0.0
+          self.cache_hits = 0
+          self.cache_misses = 0
+          self.rules = {}  # rule name -> [calls, deductions, seconds] over all games
+
+     def add(self, result):
+          won, guesses, seconds, rule_stats, hits, misses = result
+          self.games += 1
+          self.wins += won
+          self.guesses += guesses
+          self.seconds += seconds
+          self.cache_hits += hits
+          self.cache_misses += misses
+          for name, stats in rule_stats.items():
+               total = self.rules.setdefault(name, [0, 0, 0.0])
+               for k, value in enumerate(stats):
+                    total[k] += value
+
+     def interval(self):
+          return wilson_interval(self.wins, self.games, self.z)
+
+     def summary(self, elapsed):
+          lo, hi = self.interval()
+          games = max(1, self.games)
+          return (f"{self.games} games | win rate {self.wins / games:.2%} [{lo:.2%}, {hi:.2%}] | "
+                  f"{self.guesses / games:.2f} guesses/game | {self.seconds / games * 1000:.1f} ms/game | "
+                  f"{self.games / max(elapsed, 1e-9):.1f} boards/s | "
+                  f"component cache {self.cache_hits / max(1, self.cache_hits + self.cache_misses):.0%} hits")
+
+     def rule_summary(self):
+          # one line per solver rule: how often it ran and its deductions per millisecond
+          lines = []
+          for name, (calls, deductions, seconds) in self.rules.items():
+               ms = seconds * 1000
+               lines.append(f"  {name:<8} {calls:>9} calls {deductions:>9} deductions {ms:>9.0f} ms "
+                            f"{deductions / ms if ms else 0.0:>7.2f} deductions/ms")
+          return "\n".join(lines)
+
+
+def board_size(text):
+     # argparse type: a BOARD_PRESETS name or WIDTHxHEIGHTxBOMBS
+     text = text.lower().strip()
+     if text in BOARD_PRESETS:
+          return BOARD_PRESETS[text]
+     try:
+          width, height, bombs = (int(v) for v in text.split('x'))
+     except ValueError:
+          raise argparse.ArgumentTypeError(f"not a preset or WIDTHxHEIGHTxBOMBS: {text}")
+     return width, height, bombs
+
+
+def cell(text):
+     try:
+          x, y = (int(v) for v in text.split(','))
+     except ValueError:
+          raise argparse.ArgumentTypeError(f"expected X,Y: {text}")
+     return x, y
+
+
+def run_arena(width, height, bomb_count, first=None, games=1000, workers=None, solver='rules',
+              guess='safest', seed=None, confidence=0.95, target=None, min_games=100, report=None,
+              cache_path=None):
+     """Play up to `games` bot games on fresh boards in worker processes.
+
+     Stops early once the confidence interval of the win rate is at most `target` wide.
+     report(stats, elapsed) is called about once a second. cache_path keeps the solved
+     component shapes between runs. Returns (stats, elapsed seconds).
+     """
+     if first is None:
+          first = (width // 2, height // 2)
+     seeds = random.Random(seed)
+     jobs = ((width, height, bomb_count, first, seeds.getrandbits(64), solver, guess) for _ in range(games))
+     stats = ArenaStats(NormalDist().inv_cdf(0.5 + confidence / 2))
+
+     start = time.perf_counter()
+     last_report = start
+     stop = Event()
+     elapsed = None  # time of the early stop, the drain after it is not part of the run
+     with Pool(workers or cpu_count(), init_worker, (cache_path, stop)) as pool:
+          for result in pool.imap_unordered(play_game, jobs, chunksize=4):
+               if stop.is_set():
+                    continue  # draining after an early stop; games still running are not counted
+               stats.add(result)
+               now = time.perf_counter()
+               if report is not None and now - last_report >= 1.0:
+                    report(stats, now - start)
+                    last_report = now
+               if target is not None and stats.games >= min_games:
+                    lo, hi = stats.interval()
+                    if hi - lo <= target:
+                         # the queued games return at once; closing (not terminating) the pool
+                         # lets every worker save its last component cache shard
+                         stop.set()
+                         elapsed = time.perf_counter() - start
+          pool.close()
+          pool.join()
+     if cache_path is not None:
+          merge_shards(cache_path)
+     if elapsed is None:
+          elapsed = time.perf_counter() - start
+     return stats, elapsed
+
+
+def main(argv=None):
+     parser = argparse.ArgumentParser(prog='main.py arena', description='Play solver bots against many random boards.')
+     parser.add_argument('size', nargs='?', type=board_size, default='expert',
+                         help='small, beginner, intermediate, expert or WIDTHxHEIGHTxBOMBS (default expert)')
+     parser.add_argument('-n', '--games', type=int, default=1000, help='maximum number of games')
+     parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (default: all cores)')
+     parser.add_argument('--first', type=cell, default=None, help='first click X,Y (default: centre)')
+     parser.add_argument('--solver', choices=sorted(SOLVERS), default='rules')
+     parser.add_argument('--guess', choices=('safest', 'random'), default='safest',
+                         help='how to guess when the solver is stuck')
+     parser.add_argument('--seed', type=int, default=None, help='seed of the board sequence')
+     parser.add_argument('--confidence', type=float, default=0.95, help='confidence level of the win rate interval')
+     parser.add_argument('--ci-width', type=float, default=None,
+                         help='stop once the interval is at most this wide (e.g. 0.02)')
+     parser.add_argument('--min-games', type=int, default=100, help='games played before stopping early')
+     parser.add_argument('--component-cache', default=None,
+                         help='file keeping solved frontier components between runs (created if missing)')
+     args = parser.parse_args(argv)
+
+     width, height, bomb_count = args.size
+     print(f"{width}x{height}, {bomb_count} bombs, solver={args.solver}, guess={args.guess}")
+     stats, elapsed = run_arena(width, height, bomb_count, args.first, args.games, args.workers, args.solver,
+                                args.guess, args.seed, args.confidence, args.ci_width, args.min_games,
+                                report=lambda s, t: print(s.summary(t), flush=True),
+                                cache_path=args.component_cache)
+     print(stats.summary(elapsed))
+     print(stats.rule_summary())
+
+if __name__ == "__main__":
+     main()
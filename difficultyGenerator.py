@@ -0,0 +1,132 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from botArena import board_size, cell
+from boardMetrics import score_boards, solver_tier, TIERS
+
+
+class DifficultyTarget:
+     """A difficulty band: 3BV range, required solver tier and range of forced deductions (None = any)"""
+     def __init__(self, bbbv=(None, None), tier=None, deductions=(None, None)):
+          self.bbbv = bbbv
+          self.tier = tier
+          self.deductions = deductions
+
+     @property
+     def needs_solver(self):
+          return self.tier is not None or self.deductions != (None, None)
+
+     @staticmethod
+     def within(value, bounds):
+          lo, hi = bounds
+          return (lo is None or value >= lo) and (hi is None or value <= hi)
+
+     def cheap_ok(self, score):
+          # checks that only need the bitboard metrics
+          return self.within(score['3bv'], self.bbbv)
+
+     def solver_ok(self, tier, deductions):
+          return (self.tier is None or tier == self.tier) and self.within(deductions, self.deductions)
+
+     def __str__(self):
+          def band(bounds):
+               lo, hi = bounds
+               return f"{'' if lo is None else lo}-{'' if hi is None else hi}"
+          return f"3BV {band(self.bbbv)}, tier {self.tier or 'any'}, deductions {band(self.deductions)}"
+
+
+def screen_batch(width, height, bomb_count, first, seeds, target):
+     """Check a batch of seeds against target, cheap metrics first, the solvers only on survivors.
+     Returns (accepted [(position in batch, seed, score)], boards rejected by 3BV, boards rejected by the solver).
+     Module-level so it runs in the worker processes."""
+     scores = score_boards(width, height, bomb_count, seeds, first)
+     accepted = []
+     cheap_rejects = solver_rejects = 0
+     for k, (seed, score) in enumerate(zip(seeds, scores)):
+          if not target.cheap_ok(score):
+               cheap_rejects += 1
+               continue
+          if target.needs_solver:
+               score['tier'], score['deductions'] = solver_tier(width, height, bomb_count, first, seed)
+               if not target.solver_ok(score['tier'], score['deductions']):
+                    solver_rejects += 1
+                    continue
+          accepted.append((k, seed, score))
+     return accepted, cheap_rejects, solver_rejects
+
+
+def generate(width, height, bomb_count, target, count=10, first=None, seed=None, batch=256, workers=None,
+             max_attempts=10 ** 7):
+     """Seeds of `count` boards inside the target band.
+
+     Batches of candidate seeds are screened in a process pool; results are read back in batch
+     order, so the same seed gives the same boards whatever the worker count. Returns
+     (list of (seed, score, attempts since the previous accepted board), stats dict).
+     """
+     if first is None:
+          first = (width // 2, height // 2)
+     seeds = random.Random(seed)
+     found = []
+     stats = {'attempts': 0, 'cheap_rejects': 0, 'solver_rejects': 0}
+     last = -1  # candidate number of the last accepted board
+     with ProcessPoolExecutor(max_workers=workers) as pool:
+          # keep a couple of batches per worker in flight
+          in_flight = []
+          while len(found) < count and stats['attempts'] < max_attempts:
+               while len(in_flight) < 2 * (workers or os.cpu_count()):
+                    batch_seeds = [seeds.getrandbits(64) for _ in range(batch)]
+                    in_flight.append(pool.submit(screen_batch, width, height, bomb_count, first, batch_seeds, target))
+               accepted, cheap, slow = in_flight.pop(0).result()
+               for k, board_seed, score in accepted[:count - len(found)]:
+                    number = stats['attempts'] + k
+                    found.append((board_seed, score, number - last))
+                    last = number
+               stats['attempts'] += batch
+               stats['cheap_rejects'] += cheap
+               stats['solver_rejects'] += slow
+          for future in in_flight:
+               future.cancel()
+     return found, stats
+
+
+def bounds(text):
+     # argparse type: "LO-HI", "LO-" or "-HI"
+     try:
+          lo, hi = text.split('-')
+          return (int(lo) if lo else None), (int(hi) if hi else None)
+     except ValueError:
+          raise argparse.ArgumentTypeError(f"expected LO-HI, LO- or -HI: {text}")
+
+
+def main(argv=None):
+     parser = argparse.ArgumentParser(prog='main.py generate', description='Generate boards of a given difficulty.')
+     parser.add_argument('size', nargs='?', type=board_size, default='intermediate',
+                         help='small, beginner, intermediate, expert or WIDTHxHEIGHTxBOMBS (default intermediate)')
+     parser.add_argument('--3bv', dest='bbbv', type=bounds, default=(None, None), help='3BV band, e.g. 30-60')
+     parser.add_argument('--tier', choices=TIERS, default=None,
+                         help='lowest solver tier that must finish the board')
+     parser.add_argument('--deductions', type=bounds, default=(None, None), help='forced deductions band, e.g. 50-')
+     parser.add_argument('-n', '--count', type=int, default=10, help='boards to generate')
+     parser.add_argument('--first', type=cell, default=None, help='first click X,Y (default: centre)')
+     parser.add_argument('--seed', type=int, default=None, help='seed of the candidate sequence')
+     parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (default: all cores)')
+     args = parser.parse_args(argv)
+
+     width, height, bomb_count = args.size
+     target = DifficultyTarget(args.bbbv, args.tier, args.deductions)
+     print(f"{width}x{height}, {bomb_count} bombs, {target}")
+     start = time.perf_counter()
+     found, stats = generate(width, height, bomb_count, target, args.count, args.first, args.seed,
+                            workers=args.workers)
+     for board_seed, score, attempts in found:
+          extra = f" tier {score['tier']} deductions {score['deductions']}" if 'tier' in score else ""
+          print(f"seed {board_seed:>20}  3BV {score['3bv']:>4}  openings {score['openings']:>3}{extra}"
+                f"  attempts {attempts}")
+     print(f"{len(found)} boards from {stats['attempts']} candidates in {time.perf_counter() - start:.1f}s "
+           f"({stats['cheap_rejects']} rejected by 3BV, {stats['solver_rejects']} by the solver)")
+
+if __name__ == "__main__":
+     main()
@@ -0,0 +1,141 @@
+import argparse
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from generator import Board
+from bitBoard import BitLayout
+from boardMetrics import solver_steps
+from botArena import board_size
+
+
+def block_indices(width, height, x, y):
+     # row-major indices of the 3x3 block around (x, y) that the first click opens
+     return [ny * width + nx for ny in range(max(0, y - 1), min(height, y + 2))
+             for nx in range(max(0, x - 1), min(width, x + 2))]
+
+
+def first_click_batch(width, height, bomb_count, seed):
+     """Opening size of every possible first click on one seed: list indexed by cell.
+
+     All first clicks share the seed's shuffled cell order (see generator.mine_indices): the
+     bombs are its first bomb_count cells, except that bombs inside the clicked block move to
+     the next cells of the order. So every layout is the shared one plus a few moved bombs, and
+     all width * height layouts are flooded together as one BitLayout.
+     """
+     cells = width * height
+     order = list(range(cells))
+     random.Random(seed).shuffle(order)
+     base = order[:bomb_count]
+     spare = order[bomb_count:bomb_count + 18]  # enough for a 3x3 block's worth of moved bombs
+
+     L = BitLayout(width, height, cells)
+     clear = []
+     add = []
+     block_masks = []
+     for f in range(cells):
+          block = block_indices(width, height, f % width, f // width)
+          inside = set(block)
+          moved = sum(1 for i in base if i in inside)
+          clear.extend(L.position(f, i) for i in base if i in inside)
+          add.extend(L.position(f, i) for i in [i for i in spare if i not in inside][:moved])
+          block_masks.extend(L.position(f, i) for i in block)
+     bombs = (L.replicate(L.from_indices(base)) & ~L.from_positions(clear)) | L.from_positions(add)
+
+     safe = L.cells & ~bombs
+     counts = L.neighbor_counts(bombs)
+     zeros = safe & ~(counts[0] | counts[1] | counts[2] | counts[3])
+     opened = L.flood(L.from_positions(block_masks), safe, zeros)
+     return [part.bit_count() for part in L.split(opened)]
+
+
+def analyse_seed(width, height, bomb_count, seed, solver=False):
+     """(opening sizes, solver successes or None) of every first click on one seed.
+     Module-level so it runs in the worker processes."""
+     sizes = first_click_batch(width, height, bomb_count, seed)
+     solved = None
+     if solver:
+          solved = [solver_steps(Board(width, height, bomb_count, (f % width, f // width), seed))[1]
+                    for f in range(width * height)]
+     return sizes, solved
+
+
+def percentile(values, q):
+     values = sorted(values)
+     return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def analyse(width, height, bomb_count, boards=100, seed=None, solver=False, workers=None):
+     """Per first-click cell: {'mean', 'p10', 'p50', 'p90'} of the opening size and, with solver,
+     'solved' (fraction of boards the Solver finishes without guessing). List indexed by cell."""
+     if width < 1 or height < 1 or not 0 <= bomb_count <= width * height - min(3, width) * min(3, height):
+          # every cell is analysed as a first click, so the biggest block must leave room for the bombs
+          raise ValueError(f"{bomb_count} bombs do not fit a {width}x{height} board with every first click")
+     seeds = random.Random(seed)
+     per_cell = [[] for _ in range(width * height)]
+     wins = [0] * (width * height)
+     with ProcessPoolExecutor(max_workers=workers) as pool:
+          futures = [pool.submit(analyse_seed, width, height, bomb_count, seeds.getrandbits(64), solver)
+                     for _ in range(boards)]
+          for future in futures:
+               sizes, solved = future.result()
+               for f, size in enumerate(sizes):
+                    per_cell[f].append(size)
+               if solved is not None:
+                    for f, ok in enumerate(solved):
+                         wins[f] += ok
+
+     result = []
+     for f, sizes in enumerate(per_cell):
+          cell = {'mean': sum(sizes) / len(sizes), 'p10': percentile(sizes, 0.1),
+                  'p50': percentile(sizes, 0.5), 'p90': percentile(sizes, 0.9)}
+          if solver:
+               cell['solved'] = wins[f] / boards
+          result.append(cell)
+     return result
+
+
+def print_grid(title, width, values, fmt):
+     print(title)
+     for y in range(len(values) // width):
+          print(' '.join(fmt(v) for v in values[y * width:(y + 1) * width]))
+     print()
+
+
+def main(argv=None):
+     parser = argparse.ArgumentParser(prog='main.py firstclick',
+                                      description='Opening size and solver success of every first-click cell.')
+     parser.add_argument('size', nargs='?', type=board_size, default='beginner',
+                         help='small, beginner, intermediate, expert or WIDTHxHEIGHTxBOMBS (default beginner)')
+     parser.add_argument('-n', '--boards', type=int, default=200, help='seeded boards per first click')
+     parser.add_argument('--solver', action='store_true', help='also run the Solver from every first click (slow)')
+     parser.add_argument('--seed', type=int, default=None, help='seed of the board sequence')
+     parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (default: all cores)')
+     parser.add_argument('--out', default=None, help='also write the per-cell results to this JSON file')
+     args = parser.parse_args(argv)
+
+     width, height, bomb_count = args.size
+     start = time.perf_counter()
+     try:
+          cells = analyse(width, height, bomb_count, args.boards, args.seed, args.solver, args.workers)
+     except ValueError as e:
+          parser.error(str(e))
+     print(f"{width}x{height}, {bomb_count} bombs, {args.boards} boards, {time.perf_counter() - start:.1f}s\n")
+
+     print_grid("mean opening size", width, [c['mean'] for c in cells], lambda v: f"{v:5.1f}")
+     print_grid("median opening size", width, [c['p50'] for c in cells], lambda v: f"{v:5d}")
+     key = 'mean'
+     if args.solver:
+          print_grid("solved without guessing", width, [c['solved'] for c in cells], lambda v: f"{v:5.0%}")
+          key = 'solved'
+     best = max(range(len(cells)), key=lambda f: cells[f][key])
+     print(f"best first click by {key}: {(best % width, best // width)}")
+
+     if args.out:
+          with open(args.out, 'w') as f:
+               json.dump({'width': width, 'height': height, 'bomb_count': bomb_count, 'boards': args.boards,
+                          'cells': cells}, f, indent=1)
+
+if __name__ == "__main__":
+     main()
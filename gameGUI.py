@@ -1,63 +1,103 @@
 import sys
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QGridLayout, QVBoxLayout, QPushButton, QLabel)
-from PyQt6.QtGui import QIcon, QPixmap
-from PyQt6.QtCore import Qt, QSize, pyqtSignal
-import random
-from collections import deque
-from generator import Board
-
-
-class CellButton(QPushButton):
-     rightClicked = pyqtSignal(int, int)
-
-     def __init__(self, x, y, parent=None):
+import threading
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                             QFileDialog, QMessageBox)
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QKeySequence, QShortcut
+import resources
+from generator import BOARD_PRESETS, COVERED, FLAGGED
+from gameSession import GameSession, READY, PLAYING, WON, LOST
+from gameHint import HintEngine, HINT_SAFE, HINT_MINE
+from solverTrace import describe_cause
+from boardWidget import BoardView, fit_cell_size
+
+
+class HintWorker(QThread):
+     """Keeps a HintEngine in step with the player's view off the GUI thread.
+
+     The engine runs the rules after every batch of player moves, so by the time the Hint button
+     is pressed the deductions are usually done and the answer is immediate.
+     """
+     hintReady = pyqtSignal(int, object)  # game id, hint (see HintEngine.hint)
+
+     def __init__(self, parent=None):
           super().__init__(parent)
-          self.x = x
-          self.y = y
-          self.setFixedSize(50, 50)
-          self.setContentsMargins(0, 0, 0, 0)
-          self.setStyleSheet("""
-               QPushButton {
-                    background-color: transparent;
-                    border: none;
-                    padding: 0px;
-                    margin: 0px;
-                    font-size: 20px;
-                    font-weight: bold;
-               }
-          """)
-     
-     def mousePressEvent(self, event):
-          if event.button() == Qt.MouseButton.RightButton:
-               self.rightClicked.emit(self.x, self.y)
-               event.accept()
-               return
-          super().mousePressEvent(event)
+          self.cond = threading.Condition()
+          self.new_game = None  # (game id, function returning the game's Board) the engine has not seen yet
+          self.codes = {}       # index -> view code of cells changed since the last sync
+          self.asked = None     # game id a hint was asked for
+
+     def start_game(self, game_id, make_board):
+          # make_board runs in the worker, building a large board is slow
+          with self.cond:
+               self.new_game = (game_id, make_board)
+               self.codes = {}
+               self.asked = None
+               self.cond.notify()
+
+     def sync(self, codes):
+          with self.cond:
+               self.codes.update(codes)
+               self.cond.notify()
+
+     def ask(self, game_id):
+          with self.cond:
+               self.asked = game_id
+               self.cond.notify()
+
+     def stop(self):
+          self.requestInterruption()
+          with self.cond:
+               self.cond.notify()
+          self.wait()
+
+     def run(self):
+          engine = None
+          game_id = None
+          while True:
+               with self.cond:
+                    while (self.new_game is None and not self.codes and self.asked is None
+                           and not self.isInterruptionRequested()):
+                         self.cond.wait()
+                    if self.isInterruptionRequested():
+                         return
+                    new_game, codes, asked = self.new_game, self.codes, self.asked
+                    self.new_game, self.codes, self.asked = None, {}, None
+
+               if new_game is not None:
+                    game_id, make_board = new_game
+                    board = make_board()
+                    engine = HintEngine(board) if board is not None else None
+               if engine is None:
+                    continue
+               engine.sync(codes)
+               engine.advance()
+               if asked == game_id:
+                    self.hintReady.emit(game_id, engine.hint())
 
 
 class MinesweeperGUI(QMainWindow):
-     def __init__(self):
+     def __init__(self, width=10, height=10, bomb_count=15):
           super().__init__()
           self.setWindowTitle('MindSweeper Game')
 
           # Load icon
           import os
           if os.path.exists('Icon.png'):
-               self.setWindowIcon(QIcon('Icon.png'))
+               self.setWindowIcon(resources.icon('Icon.png'))
 
           # Game parameters
-          self.width = 10
-          self.height = 10
-          self.bomb_count = 15
-          self.board = None
-          self.buttons = {}
-          self.first_click = True
-
-          # Load cell image
-          import os
-          self.cell_pixmap = QPixmap('preview.png')
-          if self.cell_pixmap.isNull():
-               print("Warning: preview.png not found!")
+          self.width = width
+          self.height = height
+          self.bomb_count = bomb_count
+          self.session = GameSession(width, height, bomb_count)  # all the game rules live here
+          self.game_id = 0
+          self.hint_view = b''  # the player's view when the last hint was asked for
+
+          # the solver behind the Hint button lives in its own thread
+          self.hint_worker = HintWorker(self)
+          self.hint_worker.hintReady.connect(self.on_hint_ready)
+          self.hint_worker.start()
 
           # Setup UI
           self.setup_ui()
@@ -66,6 +106,7 @@ class MinesweeperGUI(QMainWindow):
 
           # Central widget
           central_widget = QWidget()
+          central_widget.setStyleSheet(resources.BUTTON_STYLE)  # parsed once for all buttons
           self.setCentralWidget(central_widget)
 
           # Main layout
@@ -83,7 +124,8 @@ class MinesweeperGUI(QMainWindow):
           }
           """)
 
-          subtitle = QLabel("Play the infamous Minesweeper game! (under the new name MindSweeper)")
+          subtitle = QLabel("Play the infamous Minesweeper game! (under the new name MindSweeper)\n"
+                           "Click a number whose bombs are all flagged (or middle-click it) to open its other neighbours.")
           subtitle.setAlignment(Qt.AlignmentFlag.AlignCenter)
           subtitle.setStyleSheet("""
           QLabel {
@@ -102,261 +144,185 @@ class MinesweeperGUI(QMainWindow):
           self.info_label.setStyleSheet("font-size: 16px; padding: 10px;")
           main_layout.addWidget(self.info_label)
 
-          # Grid layout for the board
-          grid_layout = QGridLayout()
-          grid_layout.setSpacing(0)  # No spacing between cells
-          grid_layout.setContentsMargins(0, 0, 0, 0)  # No margins around the grid
-
-          # Create a container widget for the grid to control its size
-          grid_container = QWidget()
-          grid_container.setLayout(grid_layout)
-          main_layout.addWidget(grid_container, alignment=Qt.AlignmentFlag.AlignCenter)
-
-          # Create buttons for each cell
-          for y in range(self.height):
-               for x in range(self.width):
-                    btn = CellButton(x, y)
-                    btn.clicked.connect(lambda checked, bx=x, by=y: self.on_cell_click(bx, by))
-                    btn.rightClicked.connect(self.on_cell_right_click)
-
-                    # Set the image as icon - scaled to button size
-                    if not self.cell_pixmap.isNull():
-                         scaled_pixmap = self.cell_pixmap.scaled(50, 50, Qt.AspectRatioMode.IgnoreAspectRatio,
-                                                                 Qt.TransformationMode.SmoothTransformation)
-                         btn.setIcon(QIcon(scaled_pixmap))
-                         btn.setIconSize(QSize(50, 50))
-
-                    grid_layout.addWidget(btn, y, x)
-                    self.buttons[(x, y)] = btn
-
-          # Reset button
-          RESET_BTN = """
-          QPushButton {
-          background-color: #cfcfcf;
-          border-top: 3px solid #ffffff;
-          border-left: 3px solid #ffffff;
-          border-right: 3px solid #7a7a7a;
-          border-bottom: 3px solid #7a7a7a;
-          padding: 8px 12px;
-          font-size: 15px;
-          font-weight: 700;
-          }
-          QPushButton:pressed {
-          border-top: 3px solid #7a7a7a;
-          border-left: 3px solid #7a7a7a;
-          border-right: 3px solid #ffffff;
-          border-bottom: 3px solid #ffffff;
-          }
-          QPushButton:disabled {
-          color: #9a9a9a;
-          }
-          """
+          # Board widget (paints every cell itself); scroll with the wheel, Ctrl + wheel zooms
+          self.board_scroll = BoardView(self.width, self.height, fit_cell_size(self.width, self.height, 50))
+          self.board_view = self.board_scroll.board
+          self.board_view.cellClicked.connect(self.on_cell_click)
+          self.board_view.cellRightClicked.connect(self.on_cell_right_click)
+          self.board_view.cellMiddleClicked.connect(self.on_chord)
+          board_layout = QHBoxLayout()
+          board_layout.addWidget(self.board_scroll, 1)
+          board_layout.addWidget(self.board_scroll.minimap, alignment=Qt.AlignmentFlag.AlignTop)
+          main_layout.addLayout(board_layout, 1)
+
+          # Hint, undo/redo, save/load and reset buttons
+          buttons = QHBoxLayout()
+          for text, slot in (('Hint', self.ask_hint), ('Undo', self.undo), ('Redo', self.redo),
+                             ('Save', self.save_game), ('Load', self.load_game)):
+               btn = QPushButton(text)
+               btn.clicked.connect(slot)
+               buttons.addWidget(btn)
           reset_btn = QPushButton('New Game')
           reset_btn.clicked.connect(self.reset_game)
-          reset_btn.setStyleSheet(RESET_BTN)
-          main_layout.addWidget(reset_btn)
+          buttons.addWidget(reset_btn, 1)
+          main_layout.addLayout(buttons)
+
+          QShortcut(QKeySequence.StandardKey.Undo, self, self.undo)
+          QShortcut(QKeySequence.StandardKey.Redo, self, self.redo)
 
      def on_cell_click(self, x, y):
-          # First click - create board
-          if self.first_click:
-               self.board = Board(self.width, self.height, self.bomb_count, (x, y))
-               self.first_click = False
-               self.update_display()
-               self.info_label.setText(f'Bombs: {self.bomb_count}')
+          # clicking a revealed number chords it
+          if self.session.state != READY and self.session.code_at(x, y) <= 8:
+               self.on_chord(x, y)
                return
+          first = self.session.state == READY
+          changed = self.session.reveal(x, y)
+          self.update_display(changed, restart_hints=first)
+          if first:
+               self.info_label.setText(f'Bombs: {self.bomb_count}')
+          self.show_result()
 
-          # Get the cell
-          cell = self.board.grid[y][x]
-
-          if cell.isFlagged:
-               return
+     def on_chord(self, x, y):
+          # the session opens every neighbour and their zero cascades in one pass,
+          # so the whole chord is a single set_cells call and a single repaint
+          self.update_display(self.session.chord(x, y))
+          self.show_result()
 
-          # If already revealed, ignore
-          if cell.revealed:
-               return
+     def on_cell_right_click(self, x, y):
+          self.update_display(self.session.flag(x, y))
+
+     def update_display(self, changed, restart_hints=False):
+          # redraw only the cells whose view code changed
+          view = self.session.view
+          self.board_view.set_cells((i, view[i]) for i in changed)
+          if changed:
+               self.board_view.set_highlight(None)
+               if restart_hints:
+                    self.restart_hints()
+               else:
+                    self.hint_worker.sync({i: view[i] for i in changed})
+
+     def restart_hints(self):
+          # a new board, or moves taken back: the hint engine starts again from the current view
+          view = self.session.view
+          self.hint_worker.start_game(self.game_id, self.session.make_board)
+          self.hint_worker.sync({i: code for i, code in enumerate(view) if code != COVERED})
+
+     def show_result(self):
+          if self.session.state == WON:
+               self.info_label.setText('🎉 You Won! 🎉')
+          elif self.session.state == LOST:
+               self.info_label.setText('💥 Game Over! 💥')
 
-          # Reveal the cell
-          cell.revealed = True
+     # ---- move log
 
-          # Check if bomb
-          if cell.isBomb:
-               self.game_over(False)
-               return
+     def undo(self):
+          self.update_display(self.session.undo(), restart_hints=True)
+          self.show_status()
 
-          # If zero, expand
-          if cell.num == 0:
-               self.expand_zeros(cell)
+     def redo(self):
+          first = self.session.state == READY
+          self.update_display(self.session.redo(), restart_hints=first)
+          self.show_status()
 
-          # Update display
-          self.update_display()
+     def show_status(self):
+          if self.session.state == READY:
+               self.info_label.setText('Click any cell to start!')
+          elif self.session.state == PLAYING:
+               self.info_label.setText(f'Bombs: {self.bomb_count}')
+          else:
+               self.show_result()
 
-          # Check for win
-          self.check_win()
-     
-     def on_cell_right_click(self, x, y):
-          if self.first_click or self.board is None:
+     def save_game(self):
+          path, _ = QFileDialog.getSaveFileName(self, 'Save Game', 'game.mind', 'MindSweeper games (*.mind)')
+          if not path:
                return
-
-          cell = self.board.grid[y][x]
-          if cell.revealed:
+          try:
+               self.session.save(path)
+          except OSError as e:
+               QMessageBox.warning(self, 'Save Game', f'Could not save {path}: {e}')
                return
+          self.info_label.setText(f'Saved {len(self.session.log)} moves')
 
-          cell.isFlagged = not cell.isFlagged
-          self.update_display()
-
-     def expand_zeros(self, cell):
-          q = deque([cell])
-          seen = set()
-
-          while q:
-               cur = q.popleft()
-               if cur in seen:
-                    continue
-               seen.add(cur)
-
-               for n in self.board.neighbors(cur):
-                    if not n.isBomb and not n.revealed:
-                         n.revealed = True
-                         if n.num == 0 and n not in seen:
-                              q.append(n)
-
-     def update_display(self):
-          for y in range(self.height):
-               for x in range(self.width):
-                    cell = self.board.grid[y][x]
-                    btn = self.buttons[(x, y)]
-
-                    if cell.revealed:
-                         btn.setIcon(QIcon())  # Remove the cell image
-                         btn.setStyleSheet("""
-                         QPushButton {
-                              background-color: #d4d4d4;
-                              border: 1px solid #888;
-                              font-size: 20px;
-                              font-weight: bold;
-                         }
-                         """)
-
-                         if cell.isBomb:
-                              # Load and show mine icon
-                              import os
-                              mine_pixmap = QPixmap('Icon.png')
-
-                              if not mine_pixmap.isNull():
-                                   scaled_mine = mine_pixmap.scaled(40, 40, Qt.AspectRatioMode.KeepAspectRatio,
-                                                                      Qt.TransformationMode.SmoothTransformation)
-                                   btn.setIcon(QIcon(scaled_mine))
-                                   btn.setIconSize(QSize(40, 40))
-                              btn.setStyleSheet("""
-                                   QPushButton {
-                                        background-color: #ff4444;
-                                        border: 1px solid #888;
-                                   }
-                              """)
-                         else:
-                              num = cell.num
-                              if num == 0:
-                                   btn.setText('')
-                              else:
-                                   btn.setText(str(num))
-                                   colors = {
-                                        1: '#0000ff', 2: '#008000', 3: '#ff0000',
-                                        4: '#000080', 5: '#800000', 6: '#008080',
-                                        7: '#000000', 8: '#808080'
-                                   }
-                                   btn.setStyleSheet(f"""
-                                        QPushButton {{
-                                             background-color: #d4d4d4;
-                                             border: 1px solid #888;
-                                             color: {colors.get(num, '#000000')};
-                                             font-size: 23px;
-                                             font-weight: bold;
-                                        }}
-                                   """)
-                         btn.setEnabled(False)
-                    else:  # NOT revealed: either flagged or covered
-                         btn.setEnabled(True)
-                         if cell.isFlagged:
-                              btn.setIcon(QIcon())
-                              btn.setText("🚩")
-                              btn.setStyleSheet("""
-                              QPushButton {
-                                   background-color: '#ffcc00';
-                                   border: 2px solid #ff8800;
-                                   font-size: 20px;
-                                   font-weight: bold;
-                              }
-                              """)
-                         else:
-                              btn.setText("")
-                              btn.setStyleSheet("""
-                              QPushButton {
-                                   background-color: transparent;
-                                   border: none;
-                                   font-size: 20px;
-                                   font-weight: bold;
-                              }
-                              """)
-                              if not self.cell_pixmap.isNull():
-                                   scaled = self.cell_pixmap.scaled(
-                                        50, 50,
-                                        Qt.AspectRatioMode.IgnoreAspectRatio,
-                                        Qt.TransformationMode.SmoothTransformation
-                                   )
-                                   btn.setIcon(QIcon(scaled))
-                                   btn.setIconSize(QSize(50, 50))
-
-     def check_win(self):
-          # Check if all non-bomb cells are revealed
-          for y in range(self.height):
-               for x in range(self.width):
-                    cell = self.board.grid[y][x]
-                    if not cell.isBomb and not cell.revealed:
-                         return
-          self.game_over(True)
-
-     def game_over(self, won):
-          # Reveal all cells
-          for y in range(self.height):
-               for x in range(self.width):
-                    self.board.grid[y][x].revealed = True
+     def load_game(self):
+          path, _ = QFileDialog.getOpenFileName(self, 'Load Game', '', 'MindSweeper games (*.mind)')
+          if not path:
+               return
+          try:
+               session = GameSession.load(path)
+          except (OSError, ValueError) as e:
+               QMessageBox.warning(self, 'Load Game', f'Could not load {path}: {e}')
+               return
+          self.set_session(session)
+
+     def set_session(self, session):
+          # show a loaded game, replayed from its moves
+          self.session = session
+          self.game_id += 1
+          if (session.width, session.height) != (self.width, self.height):
+               self.width, self.height = session.width, session.height
+               self.board_view.set_board_size(self.width, self.height, fit_cell_size(self.width, self.height, 50))
+               self.board_scroll.fit_to_board()
+          self.bomb_count = session.bomb_count
+          self.board_view.set_codes(session.view)
+          if session.state != READY:
+               self.restart_hints()
+          self.show_status()
+
+     # ---- hints
+
+     def ask_hint(self):
+          if self.session.state != PLAYING:
+               return
+          self.info_label.setText('Looking for a hint...')
+          self.hint_view = bytes(self.session.view)  # to tell whether the player moved meanwhile
+          self.hint_worker.ask(self.game_id)
 
-          self.update_display()
-          if won:
-               self.info_label.setText('🎉 You Won! 🎉')
+     def on_hint_ready(self, game_id, hint):
+          if game_id != self.game_id or self.session.state != PLAYING:
+               return
+          if hint is None:
+               self.info_label.setText(f'Bombs: {self.bomb_count}')
+               return
+          kind, i, detail = hint
+          code = self.session.view[i]
+          if code != COVERED and not (kind == HINT_SAFE and code == FLAGGED):
+               if self.session.view != self.hint_view:
+                    # the player moved while the hint was computed
+                    self.ask_hint()
+               else:
+                    self.info_label.setText(f'Bombs: {self.bomb_count}')
+               return
+          x, y = i % self.width, i // self.width
+          self.board_view.set_highlight((x, y))
+          self.board_scroll.center_on((x + 0.5) / self.width, (y + 0.5) / self.height)
+          if kind == HINT_SAFE:
+               reason = describe_cause(detail, self.width) if detail is not None else "every bomb placement"
+               self.info_label.setText(f'Hint: {(x, y)} is safe ({reason})')
+          elif kind == HINT_MINE:
+               self.info_label.setText(f'Hint: {(x, y)} is a bomb ({describe_cause(detail, self.width)})')
           else:
-               self.info_label.setText('💥 Game Over! 💥')
+               self.info_label.setText(f'Hint: no safe cell, best guess {(x, y)} ({detail:.0%} bomb risk)')
 
      def reset_game(self):
-          self.first_click = True
-          self.board = None
-
-          # Reset all buttons
-          for y in range(self.height):
-               for x in range(self.width):
-                    btn = self.buttons[(x, y)]
-                    btn.setText('')
-                    btn.setEnabled(True)
-                    btn.setStyleSheet("""
-                         QPushButton {
-                         background-color: transparent;
-                         border: none;
-                         font-size: 20px;
-                         font-weight: bold;
-                         }
-                    """)
-                    if not self.cell_pixmap.isNull():
-                         scaled_pixmap = self.cell_pixmap.scaled(50, 50, Qt.AspectRatioMode.IgnoreAspectRatio,
-                                                                 Qt.TransformationMode.SmoothTransformation)
-                         btn.setIcon(QIcon(scaled_pixmap))
-                         btn.setIconSize(QSize(50, 50))
+          self.session = GameSession(self.width, self.height, self.bomb_count)
+          self.game_id += 1
+
+          # Cover every cell again
+          self.board_view.set_board_size(self.width, self.height)
 
           self.info_label.setText('Click any cell to start!')
 
+     def closeEvent(self, event):
+          self.hint_worker.stop()
+          super().closeEvent(event)
+
 
-def main():
+def main(preset='small'):
+     # preset: a BOARD_PRESETS name or a (width, height, bomb_count) tuple
      app = QApplication(sys.argv)
-     window = MinesweeperGUI()
+     size = BOARD_PRESETS[preset] if isinstance(preset, str) else preset
+     window = MinesweeperGUI(*size)
      window.show()
      sys.exit(app.exec())
 
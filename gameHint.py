@@ -0,0 +1,107 @@
+from generator import COVERED, FLAGGED
+from solverCore import Solver
+from solverProbability import ProbabilityEngine
+
+# kinds of hint
+HINT_SAFE = 'safe'    # (HINT_SAFE, index, cause): the cell cannot be a bomb
+HINT_MINE = 'mine'    # (HINT_MINE, index, cause): the cell must be a bomb
+HINT_GUESS = 'guess'  # (HINT_GUESS, index, p): nothing is certain, the cell with the lowest bomb probability p
+
+
+class HintSolver(Solver):
+     """Solver that only learns what the player uncovers.
+
+     It works on a covered copy of the game's board and never reveals anything itself: cells
+     it proves safe are kept in `safe` instead, so every deduction only uses numbers the player
+     can see. Flags are its own (certain) ones; the player's flags are not trusted.
+     """
+     def __init__(self, board):
+          super().__init__(board)
+          self.safe = {}   # cell index -> cause, in the order they were found
+          self.mines = {}  # cell index -> cause of every flag
+          self.codes = bytearray([COVERED]) * (board.width * board.height)  # what the solver knows
+          self.changed = []  # indices of codes changed since the last probability pass
+
+     def flagCell(self, c, cause=None):
+          super().flagCell(c, cause)
+          i = self.cell_index(c)
+          self.mines[i] = cause
+          self.codes[i] = FLAGGED
+          self.changed.append(i)
+
+     def revealCell(self, c, cause=None):
+          # remember the deduction, the player decides whether to open the cell
+          if self.cell_index(c) not in self.safe:
+               self.deductions += 1
+               self.safe[self.cell_index(c)] = cause
+
+     def uncover(self, c):
+          # the player opened c
+          i = self.cell_index(c)
+          self.safe.pop(i, None)
+          super().revealCell(c)
+          self.codes[i] = c.num
+          self.changed.append(i)
+
+
+class HintEngine:
+     """Hints for one game, kept in step with the player's view.
+
+     sync() feeds the cells the player opened and advance() runs the rules to a fixpoint, so the
+     deductions are ready before a hint is asked for; hint() then only picks one. When the rules
+     find nothing, the mine probabilities of the solver's view give the safest guess.
+     """
+     def __init__(self, board):
+          self.board = board.covered_copy()
+          self.solver = HintSolver(self.board)
+          self.probability = ProbabilityEngine(board.width, board.height, board.bomb_count)
+          self.loaded = False
+          self.view = bytearray([COVERED]) * (board.width * board.height)  # the player's view
+
+     def sync(self, codes):
+          """codes: dict index -> player view code of the cells that changed"""
+          w = self.board.width
+          for i, code in codes.items():
+               self.view[i] = code
+               if code <= 8:
+                    cell = self.board.grid[i // w][i % w]
+                    if not cell.revealed:
+                         self.solver.uncover(cell)
+
+     def advance(self):
+          self.solver.run()
+
+     def hint(self):
+          """(HINT_SAFE | HINT_MINE, index, cause) or (HINT_GUESS, index, p); None if nothing is covered"""
+          self.advance()
+          if self.solver.safe:
+               i, cause = next(iter(self.solver.safe.items()))
+               return HINT_SAFE, i, cause
+          for i, cause in self.solver.mines.items():
+               if self.view[i] != FLAGGED:
+                    return HINT_MINE, i, cause
+          return self.guess()
+
+     def guess(self):
+          solver = self.solver
+          if self.loaded:
+               self.probability.load({i: solver.codes[i] for i in solver.changed}, solver.changed)
+          else:
+               self.probability.load(solver.codes)
+               self.loaded = True
+          solver.changed = []
+          probs, interior_p = self.probability.probabilities()
+
+          # cells the player flagged are never offered as a guess
+          best = min((i for i in probs if self.view[i] != FLAGGED), key=probs.get, default=None)
+          if best is None or interior_p < probs[best]:
+               # an interior cell (covered, next to no number) is the safer bet
+               for i, code in enumerate(solver.codes):
+                    if code == COVERED and i not in probs and self.view[i] != FLAGGED:
+                         return HINT_GUESS, i, interior_p
+          if best is None:
+               return None
+          if probs[best] == 0:
+               # safe in every mine placement, only the exact enumeration could tell
+               return HINT_SAFE, best, None
+          return HINT_GUESS, best, probs[best]
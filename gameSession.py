@@ -0,0 +1,291 @@
+import struct
+import sys
+from array import array
+
+from generator import Board, COVERED, FLAGGED, MINE, neighbor_indices, mine_indices, new_seed
+
+# game states
+READY = 'ready'      # waiting for the first reveal, no board yet
+PLAYING = 'playing'
+WON = 'won'
+LOST = 'lost'
+
+# moves of the log: each one is packed as index << 2 | action
+REVEAL = 0
+FLAG = 1
+CHORD = 2
+
+# saved game: magic, width, height, bomb_count, seed, then the packed moves
+SAVE_HEADER = struct.Struct('<4sIIIQ')
+SAVE_MAGIC = b'MSG1'
+SAVE_MAX_CELLS = 1 << 24  # biggest board a save may hold (moves pack the index in 30 bits)
+
+
+class GameSession:
+     """The rules of one Minesweeper game, with no GUI.
+
+     The board is generated on the first reveal so the first click is always safe; the bombs
+     come from seed (see generator.mine_indices). What the player sees is kept in view, a
+     bytearray of view codes (index = y * width + x). reveal, flag and chord return the indices
+     whose code changed, so a front end only redraws those.
+
+     Every move is logged as one packed integer; the log and the seed are the whole game, so
+     undo/redo only restore the cells a move touched and a save is a few bytes per move.
+     """
+     def __init__(self, width, height, bomb_count, seed=None):
+          self.width = width
+          self.height = height
+          self.bomb_count = bomb_count
+          self.seed = new_seed() if seed is None else seed
+          self.first_selection = None
+          self.mines = None    # bytearray, 1 where there is a bomb
+          self.numbers = None  # bytearray, bombs around each cell
+          self.view = bytearray([COVERED]) * (width * height)
+          self.safe_left = 0   # safe cells still covered
+          self.flags = 0
+          self.state = READY
+
+          self.log = array('I')  # moves played, packed (see REVEAL/FLAG/CHORD)
+          self.undo_stack = []   # per logged move: (changed indices, their old codes, state, flags, safe_left)
+          self.redo_log = array('I')
+          self.olds = None       # old codes of the cells changed by the move in progress
+
+     # ---- queries
+
+     def index(self, x, y):
+          return y * self.width + x
+
+     def code_at(self, x, y):
+          return self.view[y * self.width + x]
+
+     @property
+     def is_over(self):
+          return self.state == WON or self.state == LOST
+
+     @property
+     def mines_left(self):
+          # bombs minus flags, as shown on the counter
+          return self.bomb_count - self.flags
+
+     def neighbors(self, i):
+          return neighbor_indices(i, self.width, self.height)
+
+     def make_board(self):
+          """A generator Board with this game's bombs (for the solvers); None before the first reveal"""
+          if self.first_selection is None:
+               return None
+          return Board(self.width, self.height, self.bomb_count, self.first_selection, self.seed)
+
+     # ---- moves
+
+     def reveal(self, x, y):
+          """Open one covered cell (the first reveal starts the game)"""
+          return self.play(REVEAL, y * self.width + x)
+
+     def flag(self, x, y):
+          """Toggle the flag on a covered cell"""
+          return self.play(FLAG, y * self.width + x)
+
+     def chord(self, x, y):
+          """Open every covered neighbour of a number whose bombs are all flagged"""
+          return self.play(CHORD, y * self.width + x)
+
+     def play(self, action, i):
+          # apply and log one move; a move that changes nothing is not logged
+          before = (self.state, self.flags, self.safe_left)
+          self.olds = bytearray()
+          if action == REVEAL:
+               changed = self.do_reveal(i)
+          elif action == FLAG:
+               changed = self.do_flag(i)
+          else:
+               changed = self.do_chord(i)
+          if changed:
+               self.redo_log = array('I')  # a new move ends the redo history
+               self.log.append(i << 2 | action)
+               self.undo_stack.append((array('I', changed), bytes(self.olds)) + before)
+          self.olds = None
+          return changed
+
+     def set_code(self, i, code, changed):
+          self.olds.append(self.view[i])
+          self.view[i] = code
+          changed.append(i)
+
+     def do_reveal(self, i):
+          if self.state == READY:
+               return self.start(i)
+          if self.state != PLAYING or self.view[i] != COVERED:
+               return []
+          if self.mines[i]:
+               changed = []
+               self.set_code(i, MINE, changed)
+               return changed + self.end(False)
+          return self.open([i])
+
+     def do_flag(self, i):
+          if self.state != PLAYING:
+               return []
+          code = self.view[i]
+          changed = []
+          if code == COVERED:
+               self.set_code(i, FLAGGED, changed)
+               self.flags += 1
+          elif code == FLAGGED:
+               self.set_code(i, COVERED, changed)
+               self.flags -= 1
+          return changed
+
+     def do_chord(self, i):
+          if self.state != PLAYING or self.view[i] > 8:
+               return []
+          covered = []
+          flagged = 0
+          for j in self.neighbors(i):
+               code = self.view[j]
+               if code == COVERED:
+                    covered.append(j)
+               elif code == FLAGGED:
+                    flagged += 1
+          if flagged != self.view[i] or not covered:
+               return []
+
+          # a wrong flag around the number means one of the opened cells is a bomb
+          hit = [j for j in covered if self.mines[j]]
+          if hit:
+               changed = []
+               for j in hit:
+                    self.set_code(j, MINE, changed)
+               return changed + self.end(False)
+          return self.open(covered)
+
+     def start(self, i):
+          # place the bombs around the first reveal and open its 3x3 block
+          w = self.width
+          fx, fy = i % w, i // w
+          self.first_selection = (fx, fy)
+          self.mines = bytearray(len(self.view))
+          self.numbers = bytearray(len(self.view))
+          for m in mine_indices(w, self.height, self.bomb_count, self.first_selection, self.seed):
+               self.mines[m] = 1
+               for j in self.neighbors(m):
+                    self.numbers[j] += 1
+
+          self.flags = 0
+          self.safe_left = len(self.view) - self.bomb_count
+          self.state = PLAYING
+          block = [y * w + x for y in range(max(0, fy - 1), min(self.height, fy + 2))
+                   for x in range(max(0, fx - 1), min(w, fx + 2))]
+          return self.open(block)
+
+     def open(self, cells):
+          # reveal safe covered cells, expanding zeros, in a single pass; returns the changed indices
+          view, numbers = self.view, self.numbers
+          changed = []
+          stack = []
+          for i in cells:
+               if view[i] == COVERED:
+                    self.set_code(i, numbers[i], changed)
+                    if numbers[i] == 0:
+                         stack.append(i)
+          while stack:
+               for j in self.neighbors(stack.pop()):
+                    # a zero's neighbours are all safe, so a flag on one of them is wrong
+                    code = view[j]
+                    if code == COVERED or code == FLAGGED:
+                         if code == FLAGGED:
+                              self.flags -= 1
+                         self.set_code(j, numbers[j], changed)
+                         if numbers[j] == 0:
+                              stack.append(j)
+
+          self.safe_left -= len(changed)
+          if self.safe_left == 0:
+               changed += self.end(True)
+          return changed
+
+     def end(self, won):
+          # finish the game and uncover every cell still hidden (flags included)
+          self.state = WON if won else LOST
+          changed = []
+          for i, code in enumerate(self.view):
+               if code == COVERED or code == FLAGGED:
+                    self.set_code(i, MINE if self.mines[i] else self.numbers[i], changed)
+          return changed
+
+     # ---- undo / redo
+
+     @property
+     def can_undo(self):
+          return bool(self.log)
+
+     @property
+     def can_redo(self):
+          return bool(self.redo_log)
+
+     def undo(self):
+          """Take back the last move; returns the indices whose code changed"""
+          if not self.log:
+               return []
+          self.redo_log.append(self.log.pop())
+          changed, olds, self.state, self.flags, self.safe_left = self.undo_stack.pop()
+          if self.state == READY:
+               self.first_selection = None
+          view = self.view
+          # restore in reverse so a cell set twice in one move gets its oldest code
+          for k in range(len(changed) - 1, -1, -1):
+               view[changed[k]] = olds[k]
+          return list(changed)
+
+     def redo(self):
+          """Play the last undone move again"""
+          if not self.redo_log:
+               return []
+          entry = self.redo_log.pop()
+          redo_log = self.redo_log
+          changed = self.play(entry & 3, entry >> 2)
+          self.redo_log = redo_log
+          return changed
+
+     # ---- save / load
+
+     def to_bytes(self):
+          header = SAVE_HEADER.pack(SAVE_MAGIC, self.width, self.height, self.bomb_count, self.seed)
+          log = array('I', self.log)
+          if sys.byteorder == 'big':
+               log.byteswap()  # saves are little-endian like the header
+          return header + log.tobytes()
+
+     @classmethod
+     def from_bytes(cls, data):
+          """Rebuild a game by replaying its moves on the seeded board (ValueError if data is not a
+          valid save)"""
+          try:
+               magic, width, height, bomb_count, seed = SAVE_HEADER.unpack_from(data)
+          except struct.error:
+               raise ValueError("not a saved MindSweeper game")
+          if magic != SAVE_MAGIC:
+               raise ValueError("not a saved MindSweeper game")
+          if not (0 < width and 0 < height and width * height <= SAVE_MAX_CELLS):
+               raise ValueError(f"bad board size {width}x{height} in saved game")
+          if bomb_count >= width * height:
+               raise ValueError(f"{bomb_count} bombs do not fit a {width}x{height} board")
+          log = array('I')
+          log.frombytes(data[SAVE_HEADER.size:])
+          if sys.byteorder == 'big':
+               log.byteswap()
+          session = cls(width, height, bomb_count, seed)
+          for entry in log:
+               if entry & 3 > CHORD or entry >> 2 >= width * height:
+                    raise ValueError("corrupted move in saved game")
+               session.play(entry & 3, entry >> 2)
+          return session
+
+     def save(self, path):
+          with open(path, 'wb') as f:
+               f.write(self.to_bytes())
+
+     @classmethod
+     def load(cls, path):
+          with open(path, 'rb') as f:
+               return cls.from_bytes(f.read())
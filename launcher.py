@@ -5,12 +5,14 @@ from pathlib import Path
 from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QLabel, QPushButton
 from PyQt6.QtCore import Qt
 
+import resources
+
 
 class Launcher(QWidget):
      def __init__(self):
           super().__init__()
           self.setWindowTitle("MindSweeper Launcher")
-          self.setFixedSize(360, 260)
+          self.setFixedSize(360, 320)
 
           layout = QVBoxLayout(self)
 
@@ -29,33 +31,17 @@ class Launcher(QWidget):
 
           play_btn = QPushButton("Play Game")
           viz_btn = QPushButton("Solver Visualiser")
+          compare_btn = QPushButton("Compare Solvers")
 
-          btn_style = """
-          QPushButton {
-               background-color: #cfcfcf;
-               border-top: 3px solid #ffffff;
-               border-left: 3px solid #ffffff;
-               border-right: 3px solid #7a7a7a;
-               border-bottom: 3px solid #7a7a7a;
-               padding: 10px 12px;
-               font-size: 15px;
-               font-weight: 700;
-          }
-          QPushButton:pressed {
-               border-top: 3px solid #7a7a7a;
-               border-left: 3px solid #7a7a7a;
-               border-right: 3px solid #ffffff;
-               border-bottom: 3px solid #ffffff;
-          }
-          """
-          play_btn.setStyleSheet(btn_style)
-          viz_btn.setStyleSheet(btn_style)
+          self.setStyleSheet(resources.BUTTON_STYLE)
 
           play_btn.clicked.connect(lambda: self.launch("play"))
           viz_btn.clicked.connect(lambda: self.launch("viz"))
+          compare_btn.clicked.connect(lambda: self.launch("compare"))
 
           layout.addWidget(play_btn)
           layout.addWidget(viz_btn)
+          layout.addWidget(compare_btn)
 
      def launch(self, mode: str):
           repo_dir = Path(__file__).resolve().parent
@@ -1,16 +1,39 @@
+import importlib
 import sys
 
+# command line tools (mode -> module with a main(argv))
+CLI_TOOLS = {
+     "arena": "botArena",
+     "sweep": "solvabilitySweep",
+     "generate": "difficultyGenerator",
+     "firstclick": "firstClickAnalysis",
+     "patterns": "solverPatterns",
+}
+
 def main():
      mode = "viz"
      if len(sys.argv) >= 2:
           mode = sys.argv[1].lower().strip()
+     if mode in CLI_TOOLS:
+          # command line only, no Qt: python main.py <tool> [options], see --help
+          importlib.import_module(CLI_TOOLS[mode]).main(sys.argv[2:])
+          return
+     # optional board size: small, beginner, intermediate, expert, or WIDTHxHEIGHTxBOMBS
+     preset = "small"
+     if len(sys.argv) >= 3:
+          preset = sys.argv[2].lower().strip()
+          if preset.count("x") == 2:
+               preset = tuple(int(v) for v in preset.split("x"))
 
      if mode in ("play", "game"):
           import gameGUI
-          gameGUI.main()
+          gameGUI.main(preset)
+     elif mode == "compare":
+          import solverCompare
+          solverCompare.main(preset)
      else:
           import solverVisualiser
-          solverVisualiser.main()
+          solverVisualiser.main(preset)
 
 if __name__ == "__main__":
      main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+from PyQt6.QtGui import QPixmap, QIcon, QColor, QPen
+from PyQt6.QtCore import Qt
+
+# process-wide caches: every image is decoded once and scaled once per size,
+# colours/pens/icons are built once and shared by all the Qt front ends
+_pixmaps = {}
+_icons = {}
+_colors = {}
+_pens = {}
+
+
+# 3D grey button look shared by the launcher, game and visualiser.
+# Set it once on the window instead of on every button, so Qt parses it once.
+BUTTON_STYLE = """
+QPushButton {
+background-color: #cfcfcf;
+border-top: 3px solid #ffffff;
+border-left: 3px solid #ffffff;
+border-right: 3px solid #7a7a7a;
+border-bottom: 3px solid #7a7a7a;
+padding: 8px 12px;
+font-size: 15px;
+font-weight: 700;
+}
+QPushButton:pressed {
+border-top: 3px solid #7a7a7a;
+border-left: 3px solid #7a7a7a;
+border-right: 3px solid #ffffff;
+border-bottom: 3px solid #ffffff;
+}
+QPushButton:disabled {
+color: #9a9a9a;
+}
+"""
+
+
+def pixmap(path, width=None, height=None, keep_aspect=False):
+     """QPixmap for path, scaled to width x height (None = original size); None if the file is missing"""
+     key = (path, width, height, keep_aspect)
+     if key in _pixmaps:
+          return _pixmaps[key]
+
+     if width is None:
+          pm = QPixmap(path)
+          if pm.isNull():
+               print(f"Warning: {path} not found!")
+               pm = None
+     else:
+          pm = pixmap(path)
+          if pm is not None:
+               mode = Qt.AspectRatioMode.KeepAspectRatio if keep_aspect else Qt.AspectRatioMode.IgnoreAspectRatio
+               pm = pm.scaled(width, height, mode, Qt.TransformationMode.SmoothTransformation)
+     _pixmaps[key] = pm
+     return pm
+
+
+def icon(path):
+     if path not in _icons:
+          _icons[path] = QIcon(path)
+     return _icons[path]
+
+
+def color(name):
+     if name not in _colors:
+          _colors[name] = QColor(name)
+     return _colors[name]
+
+
+def pen(name, width=1):
+     key = (name, width)
+     if key not in _pens:
+          p = QPen(color(name))
+          p.setWidth(width)
+          _pens[key] = p
+     return _pens[key]
@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from generator import Board
+from solverCore import Solver, SOLVER_VERSION
+
+# where the first click goes, given the board size
+FIRST_CLICKS = {
+     'center': lambda w, h: (w // 2, h // 2),
+     'corner': lambda w, h: (0, 0),
+     'edge': lambda w, h: (w // 2, 0),
+}
+
+
+def point_key(width, height, bomb_count, first, boards, seed):
+     # cache key of one grid point; also seeds its boards, so a point always gets the same boards
+     return f"{width}x{height}x{bomb_count}@{first}/{boards}#{seed}"
+
+
+def solve_point(width, height, bomb_count, first, boards, seed):
+     """Run the Solver without guessing on `boards` boards of one grid point.
+     Returns {'boards', 'solved', 'analyses', 'seconds'} (totals, not means)."""
+     seeds = random.Random(point_key(width, height, bomb_count, first, boards, seed))
+     click = FIRST_CLICKS[first](width, height)
+     safe_cells = width * height - bomb_count
+     solved = analyses = 0
+     start = time.perf_counter()
+     for _ in range(boards):
+          board = Board(width, height, bomb_count, click, seeds.getrandbits(64))
+          solver = Solver(board)
+          solver.initialize()
+          while solver.step():
+               analyses += 1
+          if sum(c.revealed for row in board.grid for c in row) == safe_cells:
+               solved += 1
+     return {'boards': boards, 'solved': solved, 'analyses': analyses, 'seconds': time.perf_counter() - start}
+
+
+def solver_tag():
+     # what produced the cached results: a cache from another solver version or rule set is dropped
+     return f"v{SOLVER_VERSION}:" + ",".join(rule.name for rule in Solver.rules)
+
+
+def load_cache(path):
+     if not os.path.exists(path):
+          return {}
+     with open(path) as f:
+          data = json.load(f)
+     if data.get('solver') != solver_tag():
+          return {}
+     return data['points']
+
+
+def save_cache(cache, path):
+     # written to a temporary file first, so an interrupted sweep never leaves a broken cache
+     tmp = path + '.tmp'
+     with open(tmp, 'w') as f:
+          json.dump({'solver': solver_tag(), 'points': cache}, f, indent=1, sort_keys=True)
+     os.replace(tmp, path)
+
+
+def grid_points(sizes, densities, firsts):
+     for width, height in sizes:
+          for density in densities:
+               bomb_count = min(round(density * width * height), width * height - 9)
+               for first in firsts:
+                    yield width, height, bomb_count, first
+
+
+def sweep(sizes, densities, firsts, boards=200, seed=0, cache_path='sweep_cache.json', workers=None,
+          report=None):
+     """Solvability of every grid point; only points missing from the cache are computed.
+
+     Returns a list of (width, height, bomb_count, first, result) in grid order.
+     report(point, result) is called as each new point finishes.
+     """
+     cache = load_cache(cache_path)
+     points = list(grid_points(sizes, densities, firsts))
+     missing = [p for p in points if point_key(*p, boards, seed) not in cache]
+     if missing:
+          with ProcessPoolExecutor(max_workers=workers) as pool:
+               futures = {pool.submit(solve_point, *p, boards, seed): p for p in missing}
+               for future in as_completed(futures):
+                    point = futures[future]
+                    cache[point_key(*point, boards, seed)] = future.result()
+                    save_cache(cache, cache_path)  # every finished point survives an interruption
+                    if report is not None:
+                         report(point, cache[point_key(*point, boards, seed)])
+     return [p + (cache[point_key(*p, boards, seed)],) for p in points]
+
+
+def format_row(width, height, bomb_count, first, result):
+     n = result['boards']
+     return (f"{width:>4}x{height:<4} {bomb_count:>6} {bomb_count / (width * height):>8.3f} {first:>7} "
+             f"{result['solved'] / n:>8.1%} {result['analyses'] / n:>10.1f} {result['seconds'] / n * 1000:>9.2f}")
+
+
+def size_list(text):
+     try:
+          return [tuple(int(v) for v in s.lower().split('x')) for s in text.split(',')]
+     except ValueError:
+          raise argparse.ArgumentTypeError(f"expected WxH,WxH,...: {text}")
+
+
+def float_list(text):
+     try:
+          return [float(v) for v in text.split(',')]
+     except ValueError:
+          raise argparse.ArgumentTypeError(f"expected numbers separated by commas: {text}")
+
+
+def main(argv=None):
+     parser = argparse.ArgumentParser(prog='main.py sweep',
+                                      description='Fraction of boards the Solver finishes without guessing.')
+     parser.add_argument('--sizes', type=size_list, default=size_list('9x9,16x16,30x16'))
+     parser.add_argument('--densities', type=float_list, default=float_list('0.1,0.12,0.14,0.16,0.18,0.2,0.22'))
+     parser.add_argument('--first', default='center', help='comma separated: ' + ', '.join(FIRST_CLICKS))
+     parser.add_argument('-n', '--boards', type=int, default=200, help='boards per grid point')
+     parser.add_argument('--seed', type=int, default=0, help='seed of the boards (part of the cache key)')
+     parser.add_argument('--cache', default='sweep_cache.json', help='results file, reused across runs')
+     parser.add_argument('-j', '--workers', type=int, default=None, help='worker processes (default: all cores)')
+     args = parser.parse_args(argv)
+
+     firsts = args.first.split(',')
+     for first in firsts:
+          if first not in FIRST_CLICKS:
+               parser.error(f"unknown first click {first!r}")
+
+     header = f"{'size':>9} {'bombs':>6} {'density':>8} {'first':>7} {'solved':>8} {'analyses':>10} {'ms/board':>9}"
+     rows = sweep(args.sizes, args.densities, firsts, args.boards, args.seed, args.cache, args.workers,
+                  report=lambda p, r: print("done", format_row(*p, r), flush=True))
+     print(header)
+     for row in rows:
+          print(format_row(*row))
+
+if __name__ == "__main__":
+     main()
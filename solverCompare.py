@@ -0,0 +1,294 @@
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                             QSlider, QSpinBox)
+from PyQt6.QtCore import Qt, QObject, QTimer, pyqtSignal
+
+import resources
+from generator import Board, BOARD_PRESETS, COVERED
+from solverCore import Solver
+from solverProbability import CSPSolver
+from solverPatterns import PatternSolver
+from solverTrace import Timeline, trace_solver, describe_cause
+from boardWidget import BoardView, fit_cell_size
+
+
+# (name, solver class, options) of the solvers compared side by side
+SOLVER_CONFIGS = [
+     ("Baseline (FIFO queue)", Solver, {}),
+     ("Baseline (LIFO queue)", Solver, {'schedule': 'lifo'}),
+     ("Pattern tier", PatternSolver, {}),
+     ("CSP tier", CSPSolver, {}),
+]
+
+
+class TracePane(QWidget):
+     """One solver's trace: board, counters and the text of the shown step"""
+     def __init__(self, name, width, height, cell_size, parent=None):
+          super().__init__(parent)
+          self.timeline = None
+          self.shown_step = -1
+
+          layout = QVBoxLayout(self)
+          title = QLabel(name)
+          title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+          title.setStyleSheet("font-size: 15px; font-weight: 700; padding: 4px;")
+          layout.addWidget(title)
+
+          self.board_scroll = BoardView(width, height, cell_size)
+          self.board_view = self.board_scroll.board
+          layout.addWidget(self.board_scroll, 1)
+
+          self.stats_label = QLabel()
+          self.stats_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+          self.stats_label.setStyleSheet("font-size: 12px; padding: 4px;")
+          layout.addWidget(self.stats_label)
+
+          self.desc_label = QLabel()
+          self.desc_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+          self.desc_label.setStyleSheet("font-size: 12px; color: #666;")
+          layout.addWidget(self.desc_label)
+          self.clear()
+
+     def clear(self):
+          self.timeline = None
+          self.stats_label.setText("Solving...")
+          self.desc_label.setText("")
+
+     def set_trace(self, initial_codes, steps, seconds):
+          self.timeline = Timeline(initial_codes)
+          self.timeline.append(steps)
+          self.board_view.set_codes(initial_codes)
+          self.shown_step = -1
+
+          analyses = sum(1 for s in steps if s.action_type == "analyze")
+          deductions = sum(1 for s in steps if s.cause is not None)
+          unknown = self.timeline.tail.count(COVERED)
+          self.stats_label.setText(f"Steps: {len(steps)} | Analyses: {analyses} | Deductions: {deductions}\n"
+                                   f"Time: {seconds * 1000:.1f} ms | Unknown left: {unknown}")
+
+     def show_step(self, i):
+          if self.timeline is None or not len(self.timeline):
+               return
+          i = min(i, len(self.timeline) - 1)
+          steps = self.timeline.steps
+          if abs(i - self.shown_step) > self.timeline.interval:
+               self.board_view.set_codes(self.timeline.state_at(i))
+          else:
+               changes = {}
+               if i > self.shown_step:
+                    for j in range(self.shown_step + 1, i + 1):
+                         for idx, old, new in steps[j].delta:
+                              changes[idx] = new
+               else:
+                    for j in range(self.shown_step, i, -1):
+                         for idx, old, new in reversed(steps[j].delta):
+                              changes[idx] = old
+               self.board_view.set_cells(changes.items())
+          self.shown_step = i
+
+          step = steps[i]
+          self.board_view.set_highlight(step.cell_xy)
+          text = step.description
+          if step.cause is not None:
+               text += f" ({describe_cause(step.cause, self.board_view.board_width)})"
+          self.desc_label.setText(text)
+
+
+class ResultBridge(QObject):
+     # carries results from the pool's callback thread to the GUI thread
+     traceReady = pyqtSignal(int, int, object)  # board id, pane index, (codes, steps, seconds) or exception
+
+
+class SolverCompareGUI(QMainWindow):
+     def __init__(self, width=10, height=10, bomb_count=15, configs=SOLVER_CONFIGS):
+          super().__init__()
+          self.setWindowTitle('MindSweeper Solver Comparison')
+
+          # Load icon
+          import os
+          if os.path.exists('Icon.png'):
+               self.setWindowIcon(resources.icon('Icon.png'))
+
+          self.width = width
+          self.height = height
+          self.bomb_count = bomb_count
+          self.first_click = (width // 2, height // 2)
+          self.configs = configs
+
+          self.current_step = 0
+          self.board_id = 0
+          self.futures = []
+
+          # one worker process per solver, so they really run in parallel
+          self.pool = ProcessPoolExecutor(max_workers=len(configs))
+          self.bridge = ResultBridge()
+          self.bridge.traceReady.connect(self.on_trace_ready)
+
+          self.play_timer = QTimer(self)
+          self.play_timer.setInterval(16)
+          self.play_timer.timeout.connect(self.on_play_tick)
+          self.play_origin = (0.0, 0)
+
+          self.setup_ui()
+          self.new_board()
+
+     def setup_ui(self):
+          central_widget = QWidget()
+          central_widget.setStyleSheet(resources.BUTTON_STYLE)  # parsed once for all buttons
+          self.setCentralWidget(central_widget)
+          main_layout = QVBoxLayout()
+          central_widget.setLayout(main_layout)
+
+          title = QLabel("MindSweeper Solver Comparison")
+          title.setAlignment(Qt.AlignmentFlag.AlignCenter)
+          title.setStyleSheet("""
+          QLabel {
+               font-size: 26px;
+               font-weight: 800;
+               padding: 12px;
+               color: #222;
+          }
+          """)
+          main_layout.addWidget(title)
+
+          self.step_label = QLabel()
+          self.step_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+          self.step_label.setStyleSheet("font-size: 14px; padding: 10px; font-weight: bold;")
+          main_layout.addWidget(self.step_label)
+
+          # the panes share the screen width
+          cell_size = fit_cell_size(self.width * len(self.configs), self.height, 30, 4)
+          panes_layout = QHBoxLayout()
+          self.panes = []
+          for name, _, _ in self.configs:
+               pane = TracePane(name, self.width, self.height, cell_size)
+               panes_layout.addWidget(pane)
+               self.panes.append(pane)
+          main_layout.addLayout(panes_layout, 1)
+
+          controls = QHBoxLayout()
+          self.play_btn = QPushButton('Play')
+          self.play_btn.clicked.connect(self.toggle_play)
+
+          self.slider = QSlider(Qt.Orientation.Horizontal)
+          self.slider.setRange(0, 0)
+          self.slider.valueChanged.connect(self.on_slider)
+
+          self.speed_box = QSpinBox()
+          self.speed_box.setRange(1, 100000)
+          self.speed_box.setValue(20)
+          self.speed_box.setSuffix(' steps/s')
+          self.speed_box.valueChanged.connect(self.restart_clock)
+
+          new_btn = QPushButton('New Board')
+          new_btn.clicked.connect(self.new_board)
+
+          controls.addWidget(self.play_btn)
+          controls.addWidget(self.slider, 1)
+          controls.addWidget(self.speed_box)
+          controls.addWidget(new_btn)
+          main_layout.addLayout(controls)
+
+     def new_board(self):
+          self.stop_play()
+          for future in self.futures:
+               future.cancel()  # only helps jobs that have not started; late results are ignored
+          self.board_id += 1
+          self.current_step = 0
+          board = Board(self.width, self.height, self.bomb_count, self.first_click)
+
+          self.futures = []
+          for k, (name, solver_cls, options) in enumerate(self.configs):
+               self.panes[k].clear()
+               future = self.pool.submit(trace_solver, board, solver_cls, **options)
+               future.add_done_callback(lambda f, k=k, board_id=self.board_id: self.emit_result(board_id, k, f))
+               self.futures.append(future)
+          self.update_labels()
+
+     def emit_result(self, board_id, k, future):
+          if future.cancelled():
+               return
+          error = future.exception()
+          self.bridge.traceReady.emit(board_id, k, error if error is not None else future.result())
+
+     def on_trace_ready(self, board_id, k, result):
+          if board_id != self.board_id:
+               return
+          if isinstance(result, BaseException):
+               self.panes[k].stats_label.setText(f"Failed: {result}")
+               return
+          self.panes[k].set_trace(*result)
+          self.panes[k].show_step(self.current_step)
+          self.update_labels()
+
+     def longest(self):
+          return max((len(p.timeline) for p in self.panes if p.timeline is not None), default=0)
+
+     def update_labels(self):
+          total = self.longest()
+          running = sum(1 for p in self.panes if p.timeline is None)
+          suffix = f" ({running} solving...)" if running else ""
+          self.step_label.setText(f"Step {self.current_step + 1} / {total}{suffix}")
+          self.slider.blockSignals(True)
+          self.slider.setMaximum(max(0, total - 1))
+          self.slider.setValue(self.current_step)
+          self.slider.blockSignals(False)
+
+     def show_step(self, i):
+          self.current_step = i
+          for pane in self.panes:
+               pane.show_step(i)
+          self.update_labels()
+
+     def on_slider(self, value):
+          if value != self.current_step:
+               self.show_step(value)
+               self.restart_clock()
+
+     # ---- synchronized autoplay (same clock-driven frame skipping as the visualiser)
+
+     def toggle_play(self):
+          if self.play_timer.isActive():
+               self.stop_play()
+               return
+          if self.current_step >= self.longest() - 1:
+               self.show_step(0)
+          self.restart_clock()
+          self.play_timer.start()
+          self.play_btn.setText('Pause')
+
+     def stop_play(self):
+          self.play_timer.stop()
+          self.play_btn.setText('Play')
+
+     def restart_clock(self):
+          self.play_origin = (time.monotonic(), self.current_step)
+
+     def on_play_tick(self):
+          t0, s0 = self.play_origin
+          target = s0 + int((time.monotonic() - t0) * self.speed_box.value())
+          last = self.longest() - 1
+          if target >= last:
+               target = last
+               if all(p.timeline is not None for p in self.panes):
+                    self.stop_play()
+          if target != self.current_step and target >= 0:
+               self.show_step(target)
+
+     def closeEvent(self, event):
+          self.pool.shutdown(cancel_futures=True)
+          super().closeEvent(event)
+
+
+def main(preset='small'):
+     # preset: a BOARD_PRESETS name or a (width, height, bomb_count) tuple
+     app = QApplication(sys.argv)
+     size = BOARD_PRESETS[preset] if isinstance(preset, str) else preset
+     window = SolverCompareGUI(*size)
+     window.show()
+     sys.exit(app.exec())
+
+if __name__ == "__main__":
+     main()
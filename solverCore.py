@@ -1,25 +1,104 @@
+import time
 from collections import deque
 
+# rule ids stored in the cause of every flag/reveal
+RULE_SINGLE = 0  # cause = (RULE_SINGLE, A)
+RULE_SUBSET = 1  # cause = (RULE_SUBSET, A, B, D): U_A is a subset of U_B, D = U_B - U_A
+RULE_CSP = 2     # cause = (RULE_CSP, V) where V is the tuple of cells of the enumerated component
+RULE_PATTERN = 3  # cause = (RULE_PATTERN, N) where N is the tuple of core numbers of the matched window
+RULE_COUNT = 4    # cause = (RULE_COUNT, M, U): M mines left among the unknown cells U (global mine count)
+
+# cost classes of the rules, cheapest first: a rule only runs on a cell once every cheaper class
+# has run out of work on the whole outdated pile
+COST_LOCAL = 0    # one number on its own
+COST_PAIR = 1     # two overlapping numbers
+COST_PATTERN = 2  # table lookups in a window of numbers
+COST_GLOBAL = 3   # linear algebra or enumeration over the frontier
+
+# bump when a change to step() or to a rule changes what a solve counts or finds, so results
+# cached on disk (see solvabilitySweep) are not mixed across versions
+SOLVER_VERSION = 2
+
+MASK64 = (1 << 64) - 1
+FLAG_STATE = 10  # zobrist state of a flagged cell (revealed cells use their number)
+
+
+def mix64(x):
+     # splitmix64 finaliser: spreads every input bit over the 64 output bits
+     x = (x + 0x9E3779B97F4A7C15) & MASK64
+     x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+     x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+     return x ^ (x >> 31)
+
+
+def zobrist_key(i, state):
+     """64-bit key of cell index i being in state (0-8 revealed number, FLAG_STATE flagged).
+     Computed on the fly, so there is no per-board key table to build."""
+     return mix64(i << 4 | state)
+
+
+class Rule:
+     """A deduction rule of the registry (Solver.rules).
+
+     method names the solver method to call: method(cell) for scope 'cell' rules, which run on
+     outdated numbers, method() for scope 'board' rules, which run once no cell is outdated.
+     Either returns True when it flagged or revealed something.
+     """
+     def __init__(self, name, cost, method, scope='cell'):
+          self.name = name
+          self.cost = cost
+          self.method = method
+          self.scope = scope
+
 
 class Solver:
-     def __init__(self, board):
+     # the rules of this solver; subclasses add theirs with rules = Parent.rules + (Rule(...),)
+     rules = (
+          Rule('single', COST_LOCAL, 'singleCellAnalysis'),
+          Rule('subset', COST_PAIR, 'multiCellAnalysis'),
+          Rule('count', COST_GLOBAL, 'mineCountAnalysis', scope='board'),
+     )
+
+     def __init__(self, board, schedule='fifo'):
           self.num_bombs = 0
           self.board = board
-          # collection of outdated numbered cells
-          self.outdated_q = deque()  # queue of cells to process
-          self.outdated_set = set()  # membership check (no duplicates)
+          # cell rules grouped by cost class, cheapest first; a level is one cost class
+          costs = sorted({rule.cost for rule in self.rules if rule.scope == 'cell'})
+          self.levels = [[rule for rule in self.rules if rule.scope == 'cell' and rule.cost == cost] for cost in costs]
+          self.board_rules = sorted((rule for rule in self.rules if rule.scope == 'board'), key=lambda r: r.cost)
+          # outdated numbered cells: one queue per level, and the level each cell waits at
+          # (a cell sent back to level 0 leaves a stale entry in its old queue, skipped when popped)
+          self.queues = [deque() for _ in self.levels]
+          self.pending = {}
+          # which end of a queue is analysed next: 'fifo' (oldest first) or 'lifo' (newest first)
+          self.schedule = schedule
+          # zobrist hash of the visible state: XOR of zobrist_key over revealed and flagged cells,
+          # set by initialize() and kept up to date in O(1) by flagCell/revealCell
+          self.state_hash = 0
+          self.deductions = 0  # flags and reveals so far
+          # per rule name: [calls, deductions, seconds]
+          self.rule_stats = {rule.name: [0, 0, 0.0] for rule in self.rules}
      
-     # helper functions for outdated queue/set
-     def enqueue_outdated(self, cell):
-          if cell not in self.outdated_set:
-               self.outdated_q.append(cell)
-               self.outdated_set.add(cell)
+     # helper functions for the outdated queues
+     def enqueue_outdated(self, cell, level=0):
+          if self.pending.get(cell) != level:
+               self.queues[level].append(cell)
+               self.pending[cell] = level
 
      def dequeue_outdated(self):
-          cell = self.outdated_q.popleft()
-          self.outdated_set.remove(cell)
-          return cell
+          # (cell, level) from the cheapest level with work, None once every queue is empty
+          for level, queue in enumerate(self.queues):
+               while queue:
+                    cell = queue.popleft() if self.schedule == 'fifo' else queue.pop()
+                    if self.pending.get(cell) == level:
+                         del self.pending[cell]
+                         return cell, level
+          return None
      
+     # flat index of a cell (y * width + x), used in causes
+     def cell_index(self, cell):
+          return cell.y * self.board.width + cell.x
+
      # build the notation for a cell
      def cell_notation(self, cell):
           neighbors = list(self.board.neighbors(cell))
@@ -31,9 +110,11 @@ class Solver:
           return neighbors, n, f, U, u, b
      
      # flag a cell and add affected num. cells to outdated pile
-     def flagCell(self, c):
+     def flagCell(self, c, cause=None):
           assert c.isUnknown  # catches mistakes during development
           c.isFlagged = True
+          self.deductions += 1
+          self.state_hash ^= zobrist_key(self.cell_index(c), FLAG_STATE)
           # adds affected adjacent numbered cells to the outdated pile
           adjacents = self.board.neighbors(c)
           for adj in adjacents:
@@ -41,9 +122,11 @@ class Solver:
                     self.enqueue_outdated(adj)
 
      # reveal a cell and add affected num. cells to the outdated pile
-     def revealCell(self, c):
+     def revealCell(self, c, cause=None):
           assert c.isUnknown  # catches mistakes during development
           c.revealed = True
+          self.deductions += 1
+          self.state_hash ^= zobrist_key(self.cell_index(c), c.num)
           # enqueue the revealed cell itself
           if c.isNumber and any(nb.isUnknown for nb in self.board.neighbors(c)):
                self.enqueue_outdated(c)
@@ -62,13 +145,15 @@ class Solver:
                return False
           elif b == u and u > 0:
                # all remaining unknowns must be bombs (flagged)
+               cause = (RULE_SINGLE, self.cell_index(cell))
                for changed_cell in U:
-                    self.flagCell(changed_cell)
+                    self.flagCell(changed_cell, cause)
                return True
           elif  b == 0 and u > 0:
                # all remaining unknowns must be safe
+               cause = (RULE_SINGLE, self.cell_index(cell))
                for changed_cell in U:
-                    self.revealCell(changed_cell)
+                    self.revealCell(changed_cell, cause)
                return True
           return False
 
@@ -86,11 +171,11 @@ class Solver:
                     continue
           # compare sizes
                if u_A <= u_B:
-                    U_small, b_small = U_A, b_A
-                    U_large, b_large = U_B, b_B
+                    U_small, b_small, cell_small = U_A, b_A, cell
+                    U_large, b_large, cell_large = U_B, b_B, cell_B
                else:
-                    U_small, b_small = U_B, b_B
-                    U_large, b_large = U_A, b_A
+                    U_small, b_small, cell_small = U_B, b_B, cell_B
+                    U_large, b_large, cell_large = U_A, b_A, cell
                # apply conditions
                if b_small < 0 or b_small > len(U_small) or b_large < 0 or b_large > len(U_large):
                     print("ERROR: b (number of remaining bombs around num. cell (n - f)) is not in the right range")
@@ -102,36 +187,93 @@ class Solver:
                     if k < 0:
                          print("ERROR: k (bombs that must live in D) cannot be negative")
                          continue
+                    if k == len(D) or k == 0:
+                         cause = (RULE_SUBSET, self.cell_index(cell_small), self.cell_index(cell_large),
+                                  tuple(sorted(self.cell_index(c) for c in D)))
                     if k == len(D):  # all cells in D are bombs
                          # flag all cells in D and enqueue in outdated, for each flagged cell, its adjacent numbered cells
                          for c in D:
-                              self.flagCell(c)
+                              self.flagCell(c, cause)
                          return True
                     elif k == 0:  # all cells in D are safe
                          # reveal all cells in D and enqueue in outdated, for each revealed cell, itself if numbered and its adjacent numbered cells
                          for c in D:
-                              self.revealCell(c)
+                              self.revealCell(c, cause)
                          return True
           return False
 
-     def analyseCell(self, cell):
-          # SINGLE-CELL ANALYSIS
-          self.singleCellAnalysis(cell)
+     def mineCountAnalysis(self):
+          # the global mine count: once every mine is flagged the unknown cells are all safe, and
+          # with as many mines left as unknown cells they are all mines
+          cells = [c for row in self.board.grid for c in row]
+          unknown = [c for c in cells if c.isUnknown]
+          left = self.board.bomb_count - sum(1 for c in cells if c.isFlagged)
+          if not unknown or (left != 0 and left != len(unknown)):
+               return False
+          cause = (RULE_COUNT, left, tuple(self.cell_index(c) for c in unknown))
+          for c in unknown:
+               if left:
+                    self.flagCell(c, cause)
+               else:
+                    self.revealCell(c, cause)
+          return True
+
+     def apply_rule(self, rule, *args):
+          # run one rule, counting its calls, deductions and time
+          stats = self.rule_stats[rule.name]
+          before = self.deductions
+          start = time.perf_counter()
+          found = getattr(self, rule.method)(*args)
+          stats[2] += time.perf_counter() - start
+          stats[0] += 1
+          stats[1] += self.deductions - before
+          return found
+
+     def analyseCell(self, cell, level=0):
+          # the rules of one level; a cell they find nothing for moves up to the next level
+          found = False
+          for rule in self.levels[level]:
+               found = self.apply_rule(rule, cell) or found
+          if not found and level + 1 < len(self.levels) and any(nb.isUnknown for nb in self.board.neighbors(cell)):
+               self.enqueue_outdated(cell, level + 1)
+          return found
 
-          # MULTI-CELL ANALYSIS
-          self.multiCellAnalysis(cell)
+     def rule_yield(self):
+          """{rule name: (calls, deductions, milliseconds, deductions per millisecond)}"""
+          report = {}
+          for name, (calls, deductions, seconds) in self.rule_stats.items():
+               ms = seconds * 1000
+               report[name] = (calls, deductions, ms, deductions / ms if ms else 0.0)
+          return report
 
      def initialize(self):
-          # build initial outdated list
+          # build initial outdated list and the state hash
+          self.state_hash = 0
           for i in range(self.board.height):
                for j in range(self.board.width):
                     cell = self.board.grid[i][j]
+                    if cell.isNumber:
+                         self.state_hash ^= zobrist_key(self.cell_index(cell), cell.num)
+                    elif cell.isFlagged:
+                         self.state_hash ^= zobrist_key(self.cell_index(cell), FLAG_STATE)
                     if cell.isNumber and any(nb.isUnknown for nb in self.board.neighbors(cell)):
                          self.enqueue_outdated(cell)
 
+     def step(self):
+          # analyse one cell from the cheapest outdated queue; with every queue empty, run the board
+          # rules in cost order until one makes a new deduction. Returns False once nothing is left
+          entry = self.dequeue_outdated()
+          if entry is not None:
+               self.analyseCell(*entry)
+               return True
+          for rule in self.board_rules:
+               before = self.deductions
+               self.apply_rule(rule)
+               if self.deductions != before:
+                    return True
+          return False
+
      def run(self):
           # loops to analyse cells in the outdated pile and deletes them after the analysis until there are no outdated cells in the pile (no more changes have occurred)
-          while self.outdated_q:
-               # pick one cell, delete it & analyse it
-               cell = self.dequeue_outdated()
-               self.analyseCell(cell)
\ No newline at end of file
+          while self.step():
+               pass
\ No newline at end of file
@@ -0,0 +1,255 @@
+import argparse
+import os
+import time
+import zlib
+from array import array
+
+from solverCore import Solver, Rule, COST_PATTERN, RULE_PATTERN
+
+# cores of numbers (width, height) the table covers, smallest first. The window of a core is the
+# core plus a ring of one cell: 4x3 for 2x1, 5x3 for 3x1 (1-2-1), 4x4 for 2x2, 6x3 for 4x1
+# (1-2-2-1). Vertical cores are looked up in the same table with x and y swapped.
+SHAPES = ((2, 1), (3, 1), (2, 2), (4, 1))
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'patterns.bin')
+TABLE_MAGIC = b'PAT1'
+
+
+def shape_cells(width, height):
+     """(core, ring) of a core shape: (x, y) window coordinates, row by row"""
+     core = [(x + 1, y + 1) for y in range(height) for x in range(width)]
+     ring = [(x, y) for y in range(height + 2) for x in range(width + 2) if (x, y) not in core]
+     return core, ring
+
+
+def pattern_key(shape, unknown, remaining):
+     # unknown: bit j set when ring cell j is unknown; remaining: 4 bits per core number (n - flags)
+     return shape << 32 | remaining << 16 | unknown
+
+
+def shape_entries(shape, known):
+     """Forced cells of one core shape: {pattern_key: safe mask | mine mask << 16}.
+
+     Every ring of unknowns is tried with every bomb placement, and the forced cells of each
+     (unknowns, remaining counts) pair are the ones that are safe or bombs in all of its
+     placements. Patterns the single-cell rule already solves, or that a smaller core inside
+     this one solves just as well (found in known), are left out.
+     """
+     width, height = SHAPES[shape]
+     core, ring = shape_cells(width, height)
+     # what a bomb on each ring cell adds to the packed remaining counts of the core
+     weight = [sum(1 << 4 * k for k, (cx, cy) in enumerate(core) if abs(cx - x) <= 1 and abs(cy - y) <= 1)
+               for x, y in ring]
+     low = [sum(weight[j] for j in range(6) if s >> j & 1) for s in range(64)]
+     high = [sum(weight[j + 6] for j in range(len(ring) - 6) if s >> j & 1) for s in range(1 << len(ring) - 6)]
+     subs = sub_placements(width, height)
+
+     entries = {}
+     for unknown in range(1, 1 << len(ring)):
+          per_count = {}  # packed remaining counts -> [bombs in every placement, bombs in some placement]
+          bombs = unknown
+          while True:
+               counts = low[bombs & 63] + high[bombs >> 6]
+               seen = per_count.get(counts)
+               if seen is None:
+                    per_count[counts] = [bombs, bombs]
+               else:
+                    seen[0] &= bombs
+                    seen[1] |= bombs
+               if bombs == 0:
+                    break
+               bombs = (bombs - 1) & unknown
+          sizes = low[unknown & 63] + high[unknown >> 6]  # unknowns around each core number
+          for counts, (always, sometimes) in per_count.items():
+               safe = unknown & ~sometimes
+               if not (safe or always) or single_rule(counts, sizes, len(core)):
+                    continue
+               found = safe | always << 16
+               if any(sub_result(sub, known, unknown, counts) == found for sub in subs):
+                    continue
+               entries[pattern_key(shape, unknown, counts)] = found
+     return entries
+
+
+def single_rule(counts, sizes, numbers):
+     # whether some core number alone already decides its unknowns
+     for k in range(numbers):
+          b, u = counts >> 4 * k & 15, sizes >> 4 * k & 15
+          if u and (b == 0 or b == u):
+               return True
+     return False
+
+
+def sub_placements(width, height):
+     """Smaller table cores inside a core: (shape, ring bit of each sub-ring cell, core number of
+     each sub-core number) for every placement and orientation"""
+     core, ring = shape_cells(width, height)
+     found = []
+     for shape, (w, h) in enumerate(SHAPES):
+          if (w, h) == (width, height):
+               break
+          for sw, sh, swap in ((w, h, False), (h, w, True)):
+               if swap and w == h:
+                    continue
+               for oy in range(height - sh + 1):
+                    for ox in range(width - sw + 1):
+                         place = lambda x, y: (ox + (y if swap else x), oy + (x if swap else y))
+                         sub_core, sub_ring = shape_cells(w, h)
+                         ring_bits = [ring.index(place(x, y)) if place(x, y) in ring else None for x, y in sub_ring]
+                         core_numbers = [core.index(place(x, y)) for x, y in sub_core]
+                         found.append((shape, ring_bits, core_numbers))
+     return found
+
+
+def sub_result(sub, known, unknown, counts):
+     """What the table gives for a smaller core's window inside a bigger one (cells of the bigger
+     core are numbers), in the ring bits of the bigger window; None if it gives nothing"""
+     shape, ring_bits, core_numbers = sub
+     sub_unknown = 0
+     for j, bit in enumerate(ring_bits):
+          if bit is not None and unknown >> bit & 1:
+               sub_unknown |= 1 << j
+     sub_counts = 0
+     for k, number in enumerate(core_numbers):
+          sub_counts |= (counts >> 4 * number & 15) << 4 * k
+     found = known.get(pattern_key(shape, sub_unknown, sub_counts))
+     if found is None:
+          return None
+     result = 0
+     for j, bit in enumerate(ring_bits):
+          if found >> j & 1:
+               result |= 1 << bit
+          if found >> 16 + j & 1:
+               result |= 1 << 16 + bit
+     return result
+
+
+def build_table():
+     table = {}
+     for shape in range(len(SHAPES)):
+          table.update(shape_entries(shape, table))
+     return table
+
+
+def save_table(table, path=TABLE_PATH):
+     # magic, entry count, then zlib of the sorted keys as differences and the values
+     keys = sorted(table)
+     deltas = array('Q', (b - a for a, b in zip([0] + keys, keys)))
+     values = array('I', (table[k] for k in keys))
+     with open(path, 'wb') as f:
+          f.write(TABLE_MAGIC + len(keys).to_bytes(4, 'little'))
+          f.write(zlib.compress(deltas.tobytes() + values.tobytes(), 9))
+
+
+def load_table(path=TABLE_PATH):
+     with open(path, 'rb') as f:
+          if f.read(4) != TABLE_MAGIC:
+               raise ValueError(f"{path} is not a pattern table")
+          count = int.from_bytes(f.read(4), 'little')
+          data = zlib.decompress(f.read())
+     deltas = array('Q', data[:8 * count])
+     values = array('I', data[8 * count:])
+     keys = []
+     key = 0
+     for d in deltas:
+          key += d
+          keys.append(key)
+     return dict(zip(keys, values))
+
+
+_table = None
+
+
+def pattern_table():
+     """The pattern table, read from TABLE_PATH on first use (built and written there if missing)"""
+     global _table
+     if _table is None:
+          if os.path.exists(TABLE_PATH):
+               _table = load_table()
+          else:
+               _table = build_table()
+               save_table(_table)
+     return _table
+
+
+class PatternSolver(Solver):
+     """Solver with a pattern tier: after the single-cell and subset rules, the windows around an
+     outdated number are looked up in the pattern table (1-2-1, 1-2-2-1 and the like)"""
+     rules = Solver.rules + (Rule('pattern', COST_PATTERN, 'patternCellAnalysis'),)
+
+     def __init__(self, board, schedule='fifo'):
+          super().__init__(board, schedule)
+          self.table = pattern_table()
+          # per table shape and orientation: (shape, core, ring), window coordinates already swapped;
+          # biggest cores first, so a pattern is solved by one lookup
+          self.placements = []
+          for shape, (w, h) in reversed(list(enumerate(SHAPES))):
+               core, ring = shape_cells(w, h)
+               self.placements.append((shape, core, ring))
+               if w != h:
+                    self.placements.append((shape, [(y, x) for x, y in core], [(y, x) for x, y in ring]))
+
+     def window_key(self, shape, core, ring, ox, oy, remaining):
+          """(pattern key, numbers of the core, [(ring bit, unknown cell)]) of the window at (ox, oy),
+          or None when the core is not all numbers or the ring has no unknown.
+          remaining: memo of n - flags per number, shared by the lookups of one analysis"""
+          board = self.board
+          numbers = []
+          counts = 0
+          for k, (x, y) in enumerate(core):
+               x, y = ox + x, oy + y
+               if not (0 <= x < board.width and 0 <= y < board.height) or not board.grid[y][x].isNumber:
+                    return None
+               number = board.grid[y][x]
+               b = remaining.get(number)
+               if b is None:
+                    b = remaining[number] = number.num - sum(1 for nb in board.neighbors(number) if nb.isFlagged)
+               if b < 0:
+                    return None
+               numbers.append(number)
+               counts |= b << 4 * k
+          unknown = 0
+          cells = []
+          for j, (x, y) in enumerate(ring):
+               x, y = ox + x, oy + y
+               if 0 <= x < board.width and 0 <= y < board.height and board.grid[y][x].isUnknown:
+                    unknown |= 1 << j
+                    cells.append((j, board.grid[y][x]))
+          if not unknown:
+               return None
+          return pattern_key(shape, unknown, counts), numbers, cells
+
+     def patternCellAnalysis(self, cell):
+          # look up every window that has cell in its core; apply the first pattern found
+          remaining = {}
+          for shape, core, ring in self.placements:
+               for cx, cy in core:
+                    window = self.window_key(shape, core, ring, cell.x - cx, cell.y - cy, remaining)
+                    if window is None:
+                         continue
+                    key, numbers, cells = window
+                    found = self.table.get(key)
+                    if found is None:
+                         continue
+                    cause = (RULE_PATTERN, tuple(self.cell_index(c) for c in numbers))
+                    for j, c in cells:
+                         if found >> j & 1:
+                              self.revealCell(c, cause)
+                         elif found >> 16 + j & 1:
+                              self.flagCell(c, cause)
+                    return True
+          return False
+
+
+def main(argv=None):
+     parser = argparse.ArgumentParser(prog='main.py patterns', description='Build the local pattern table.')
+     parser.add_argument('--out', default=TABLE_PATH, help='table file (default: patterns.bin next to the solver)')
+     args = parser.parse_args(argv)
+
+     start = time.perf_counter()
+     table = build_table()
+     save_table(table, args.out)
+     print(f"{len(table)} patterns written to {args.out} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+     main()
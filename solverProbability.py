@@ -0,0 +1,522 @@
+import pickle
+import threading
+from collections import OrderedDict
+from math import comb
+
+from generator import COVERED, FLAGGED, MINE, neighbor_indices
+from solverCore import Solver, Rule, COST_GLOBAL, RULE_CSP, RULE_COUNT, FLAG_STATE, mix64, zobrist_key
+
+# give up exact enumeration of a frontier component after this many search nodes
+NODE_LIMIT = 200000
+ENDGAME_UNKNOWNS = 64  # unknown cells left when CSPSolver starts its exact endgame
+
+
+def solve_component(variables, constraints):
+     """Enumerate every mine placement of one frontier component.
+
+     variables: tuple of cell indices; constraints: list of (tuple of cell indices, remaining mines).
+     Returns {m: (solutions, [mines per variable])} keyed by the number of mines m used,
+     or None if the search goes over NODE_LIMIT.
+     """
+     pos = {v: k for k, v in enumerate(variables)}
+     n = len(variables)
+     need = [r for _, r in constraints]
+     free = [len(cells) for cells, _ in constraints]
+     var_cons = [[] for _ in range(n)]
+     for c, (cells, _) in enumerate(constraints):
+          for v in cells:
+               var_cons[pos[v]].append(c)
+
+     result = {}
+     assignment = [0] * n
+     # depth-first search with an explicit stack (a component can have thousands of variables):
+     # frames[k] = [next value to try for variable k, value applied below it or -1]
+     frames = [[0, -1]]
+     mines = 0
+     nodes = 1
+     while frames:
+          k = len(frames) - 1
+          frame = frames[k]
+          if k == n:
+               if mines not in result:
+                    result[mines] = [0, [0] * n]
+               entry = result[mines]
+               entry[0] += 1
+               per_var = entry[1]
+               for j in range(n):
+                    if assignment[j]:
+                         per_var[j] += 1
+               frames.pop()
+               continue
+          value = frame[1]
+          if value >= 0:
+               # back from the search below: take the value back
+               for c in var_cons[k]:
+                    free[c] += 1
+                    need[c] += value
+               mines -= value
+               assignment[k] = 0
+               frame[1] = -1
+          value = frame[0]
+          if value > 1:
+               frames.pop()
+               continue
+          frame[0] += 1
+          ok = True
+          for c in var_cons[k]:
+               free[c] -= 1
+               need[c] -= value
+          for c in var_cons[k]:
+               if need[c] < 0 or need[c] > free[c]:
+                    ok = False
+                    break
+          if ok:
+               assignment[k] = value
+               mines += value
+               frame[1] = value
+               nodes += 1
+               if nodes > NODE_LIMIT:
+                    return None
+               frames.append([0, -1])
+          else:
+               for c in var_cons[k]:
+                    free[c] += 1
+                    need[c] += value
+
+     return {m: (sols, per_var) for m, (sols, per_var) in result.items()}
+
+
+# the 8 rotations/reflections of the grid, on (x, y)
+SYMMETRIES = (
+     lambda x, y: (x, y), lambda x, y: (-x, y), lambda x, y: (x, -y), lambda x, y: (-x, -y),
+     lambda x, y: (y, x), lambda x, y: (-y, x), lambda x, y: (y, -x), lambda x, y: (-y, -x),
+)
+
+
+def component_shape(variables, constraints, width):
+     """Canonical shape of a component: (key, order).
+
+     Variables are renumbered by their position in the component (row by row), under each of
+     the 8 symmetries, and the smallest resulting constraint list is the key; so the same
+     pattern anywhere on any board, turned or mirrored, has the same key. order[r] is the
+     position in variables of the variable numbered r.
+     """
+     coords = [(v % width, v // width) for v in variables]
+     best = None
+     for sym in SYMMETRIES:
+          points = [sym(x, y) for x, y in coords]
+          order = sorted(range(len(variables)), key=lambda k: (points[k][1], points[k][0]))
+          rank = {variables[k]: r for r, k in enumerate(order)}
+          key = tuple(sorted((tuple(sorted(rank[v] for v in cells)), r) for cells, r in constraints))
+          if best is None or key < best[0]:
+               best = (key, order)
+     return best
+
+
+class ComponentCache:
+     """Bounded LRU of solve_component results keyed by component_shape, with hit/miss counts.
+
+     Results are stored with the variables in shape order. Thread-safe, since the GUIs solve
+     in worker threads; save()/load() keep it between runs.
+     """
+     MISSING = object()
+
+     def __init__(self, limit=50000):
+          self.limit = limit
+          self.entries = OrderedDict()
+          self.hits = 0
+          self.misses = 0
+          self.lock = threading.Lock()
+
+     def get(self, key):
+          with self.lock:
+               result = self.entries.get(key, self.MISSING)
+               if result is self.MISSING:
+                    self.misses += 1
+               else:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+               return result
+
+     def put(self, key, result):
+          with self.lock:
+               self.entries[key] = result
+               self.entries.move_to_end(key)
+               if len(self.entries) > self.limit:
+                    self.entries.popitem(last=False)
+
+     def stats(self):
+          return {'hits': self.hits, 'misses': self.misses, 'size': len(self.entries)}
+
+     def save(self, path):
+          with self.lock:
+               items = list(self.entries.items())
+          with open(path, 'wb') as f:
+               pickle.dump(items, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+     def load(self, path):
+          """Add the entries saved in path (only load files this program wrote: it is a pickle)"""
+          with open(path, 'rb') as f:
+               items = pickle.load(f)
+          for key, result in items:
+               self.put(key, result)
+
+
+# shared by every engine of the process, so shapes recur across boards and solvers
+SHAPE_CACHE = ComponentCache()
+
+
+def convolve(a, b):
+     out = {}
+     for i, x in a.items():
+          for j, y in b.items():
+               out[i + j] = out.get(i + j, 0) + x * y
+     return out
+
+
+def combine_weights(solved, interior, remaining):
+     """Exact form of combine, in placement counts.
+
+     Returns (dict index -> placements with a mine on that frontier variable, total placements,
+     interior mines summed over all placements), or None if no placement fits the global count.
+     """
+     dists = [{m: sols for m, (sols, _) in result.items()} for _, result in solved]
+     prefix = [{0: 1}]
+     for d in dists:
+          prefix.append(convolve(prefix[-1], d))
+     suffix = [{0: 1}]
+     for d in reversed(dists):
+          suffix.append(convolve(suffix[-1], d))
+     suffix.reverse()
+
+     # ways to place the rest of the mines in the interior, given t mines on the frontier
+     def interior_ways(t):
+          rest = remaining - t
+          return comb(interior, rest) if 0 <= rest <= interior else 0
+
+     total = sum(ways * interior_ways(t) for t, ways in prefix[-1].items())
+     if total == 0:
+          return None
+
+     weights = {}
+     for k, (variables, result) in enumerate(solved):
+          others = convolve(prefix[k], suffix[k + 1])
+          for v in variables:
+               weights.setdefault(v, 0)
+          for m, (sols, per_var) in result.items():
+               weight = sum(ways * interior_ways(m + t) for t, ways in others.items())
+               if weight == 0:
+                    continue
+               for v, count in zip(variables, per_var):
+                    weights[v] += count * weight
+
+     interior_mines = sum(ways * interior_ways(t) * (remaining - t) for t, ways in prefix[-1].items())
+     return weights, total, interior_mines
+
+
+def combine(solved, interior, remaining):
+     """Mine probability of every frontier variable and of an interior cell.
+
+     solved: list of (variables, result of solve_component); interior: number of unknown cells
+     touching no number; remaining: mines not yet flagged. Returns (dict index -> p, interior p),
+     or None if no placement fits the global mine count.
+     """
+     combined = combine_weights(solved, interior, remaining)
+     if combined is None:
+          return None
+     weights, total, interior_mines = combined
+     probs = {v: w / total for v, w in weights.items()}
+     interior_p = interior_mines / total / interior if interior else 0.0
+     return probs, interior_p
+
+
+class ProbabilityEngine:
+     """Mine probabilities of the unknown cells of a view (bytearray of view codes).
+
+     The engine keeps the constraints of the last view, so update() with the list of changed
+     indices only recomputes the numbers around those cells, and every solved frontier
+     component is cached by its constraints, so components an update did not touch are reused.
+     New components go through shape_cache, so a pattern seen anywhere before is not searched again.
+     """
+     def __init__(self, width, height, bomb_count, shape_cache=SHAPE_CACHE):
+          self.width = width
+          self.height = height
+          self.bomb_count = bomb_count
+          self.shape_cache = shape_cache  # ComponentCache by component shape, None to always search
+          self.view = None
+          self.constraints = {}  # number cell index -> (tuple of covered neighbours, remaining mines)
+          self.hashes = {}       # number cell index -> 64-bit hash of its constraint (see constraint_hash)
+          self.cache = {}        # component constraints -> solve_component result
+          self.cache_limit = 20000
+
+     def constraint_of(self, i):
+          code = self.view[i]
+          if code > 8:
+               return None
+          covered = []
+          flagged = 0
+          for j in neighbor_indices(i, self.width, self.height):
+               c = self.view[j]
+               if c == COVERED:
+                    covered.append(j)
+               elif c == FLAGGED:
+                    flagged += 1
+          if not covered:
+               return None
+          return tuple(covered), code - flagged
+
+     def constraint_hash(self, i, con):
+          # the number, its flagged neighbours and its covered cells, mixed again so that XOR-ing
+          # the hashes of constraints sharing cells cannot cancel them out
+          h = zobrist_key(i, self.view[i])
+          for j in neighbor_indices(i, self.width, self.height):
+               if self.view[j] == FLAGGED:
+                    h ^= zobrist_key(j, FLAG_STATE)
+          for v in con[0]:
+               h ^= mix64(v)
+          return mix64(h)
+
+     def set_constraint(self, i):
+          con = self.constraint_of(i)
+          if con is None:
+               self.constraints.pop(i, None)
+               self.hashes.pop(i, None)
+          else:
+               self.constraints[i] = con
+               self.hashes[i] = self.constraint_hash(i, con)
+
+     def update(self, view, changed=None):
+          """Load a new view and return (dict index -> mine probability for frontier cells,
+          probability of interior cells).
+
+          changed: indices that differ from the previous view (None = unknown, reload everything);
+          with changed given, view only needs to be indexable by those indices.
+          """
+          self.load(view, changed)
+          return self.probabilities()
+
+     def load(self, view, changed=None):
+          # update() without computing probabilities
+          if changed is None or self.view is None:
+               self.view = bytearray(view)
+               self.constraints = {}
+               self.hashes = {}
+               for i in range(len(self.view)):
+                    if self.view[i] <= 8:
+                         self.set_constraint(i)
+          else:
+               touched = set()
+               for i in changed:
+                    self.view[i] = view[i]
+                    touched.add(i)
+                    touched.update(neighbor_indices(i, self.width, self.height))
+               for i in touched:
+                    self.set_constraint(i)
+
+     def groups(self):
+          # union-find of the constraints over shared cells: list of (variables, constraint cell indices)
+          parent = {}
+
+          def find(v):
+               while parent[v] != v:
+                    parent[v] = parent[parent[v]]
+                    v = parent[v]
+               return v
+
+          for cells, _ in self.constraints.values():
+               for v in cells:
+                    parent.setdefault(v, v)
+               root = find(cells[0])
+               for v in cells[1:]:
+                    r = find(v)
+                    if r != root:
+                         parent[r] = root
+
+          groups = {}
+          for v in parent:
+               groups.setdefault(find(v), [[], []])[0].append(v)
+          for i, con in self.constraints.items():
+               groups[find(con[0][0])][1].append(i)
+          return list(groups.values())
+
+     def components(self):
+          """Split the constraints into independent frontier components: list of (variables, constraints)"""
+          return [(tuple(sorted(vs)), sorted(self.constraints[i] for i in cons)) for vs, cons in self.groups()]
+
+     def component_hashes(self):
+          """(variables, 64-bit sub-hash) of every frontier component.
+
+          A component's sub-hash is the XOR of its constraints' hashes, which are kept up to date
+          as cells change, so a component no move touched keeps its hash.
+          """
+          out = []
+          for vs, cons in self.groups():
+               h = 0
+               for i in cons:
+                    h ^= self.hashes[i]
+               out.append((tuple(sorted(vs)), h))
+          return out
+
+     def solve(self, variables, constraints):
+          key = tuple(constraints)
+          if key in self.cache:
+               return self.cache[key]
+          if self.shape_cache is None:
+               result = solve_component(variables, constraints)
+          else:
+               result = self.solve_shape(variables, constraints)
+          if len(self.cache) >= self.cache_limit:
+               self.cache.clear()
+          self.cache[key] = result
+          return result
+
+     def solve_shape(self, variables, constraints):
+          # solve_component through the shape cache: the search only runs for a new shape
+          shape, order = component_shape(variables, constraints, self.width)
+          stored = self.shape_cache.get(shape)
+          if stored is ComponentCache.MISSING:
+               result = solve_component(variables, constraints)
+               stored = None if result is None else {
+                    m: (sols, [per_var[k] for k in order]) for m, (sols, per_var) in result.items()}
+               self.shape_cache.put(shape, stored)
+               return result
+          if stored is None:
+               return None
+          result = {}
+          for m, (sols, canonical) in stored.items():
+               per_var = [0] * len(order)
+               for r, k in enumerate(order):
+                    per_var[k] = canonical[r]
+               result[m] = (sols, per_var)
+          return result
+
+     def probabilities(self):
+          view = self.view
+          unknown = view.count(COVERED)
+          remaining = self.bomb_count - view.count(FLAGGED) - view.count(MINE)
+          solved = []
+          frontier = 0
+          approx = {}
+          for variables, constraints in self.components():
+               frontier += len(variables)
+               result = self.solve(variables, constraints)
+               if result is None:
+                    # too big to enumerate: fall back to the densest constraint on each cell
+                    for cells, r in constraints:
+                         for v in cells:
+                              approx[v] = max(approx.get(v, 0.0), r / len(cells))
+               else:
+                    solved.append((variables, result))
+
+          interior = unknown - frontier
+          # mines expected in the components we could not enumerate
+          expected_approx = round(sum(approx.values()))
+          combined = combine(solved, interior, remaining - expected_approx)
+          if combined is None:
+               return approx, 0.0
+          probs, interior_p = combined
+          probs.update(approx)
+          return probs, interior_p
+
+
+class CSPSolver(Solver):
+     """Solver with an exact-enumeration tier.
+
+     When the cell rules run out of outdated cells, every frontier component is enumerated;
+     cells that are a mine in all of its solutions are flagged, cells that are safe in all of
+     them are revealed, and the outdated pile starts again from those. Once at most
+     endgame_unknowns cells are unknown, the components are also weighed against the global
+     mine count (see endgame_pass).
+     """
+     rules = Solver.rules + (
+          Rule('csp', COST_GLOBAL, 'csp_pass', scope='board'),
+          Rule('endgame', COST_GLOBAL, 'endgame_pass', scope='board'),
+     )
+
+     def __init__(self, board, endgame_unknowns=ENDGAME_UNKNOWNS, **options):
+          super().__init__(board, **options)
+          self.engine = ProbabilityEngine(board.width, board.height, board.bomb_count)
+          self.changed = None  # cells changed since the last enumeration pass (None = never ran)
+          self.csp_passes = 0
+          self.endgame_unknowns = endgame_unknowns
+
+     def flagCell(self, c, cause=None):
+          super().flagCell(c, cause)
+          if self.changed is not None:
+               self.changed.append(self.cell_index(c))
+
+     def revealCell(self, c, cause=None):
+          super().revealCell(c, cause)
+          if self.changed is not None:
+               self.changed.append(self.cell_index(c))
+
+     def sync_engine(self):
+          # bring the engine's view up to date with the board
+          if self.changed is None:
+               self.engine.load(self.board.view_codes())
+          else:
+               grid, w = self.board.grid, self.board.width
+               self.engine.load({i: grid[i // w][i % w].code for i in self.changed}, self.changed)
+          self.changed = []
+
+     def csp_pass(self):
+          # returns True if the enumeration found anything to flag or reveal
+          self.csp_passes += 1
+          self.sync_engine()
+          found = False
+          for variables, constraints in self.engine.components():
+               result = self.engine.solve(variables, constraints)
+               if result is None:
+                    continue
+               solutions = sum(sols for sols, _ in result.values())
+               cause = (RULE_CSP, variables)
+               for k, v in enumerate(variables):
+                    mines = sum(per_var[k] for _, per_var in result.values())
+                    cell = self.board.grid[v // self.board.width][v % self.board.width]
+                    if mines == solutions:
+                         self.flagCell(cell, cause)
+                         found = True
+                    elif mines == 0:
+                         self.revealCell(cell, cause)
+                         found = True
+          return found
+
+     def endgame_pass(self):
+          """Exact endgame: every placement of the remaining mines over the last unknown cells is
+          counted (component solutions times the ways to fill the interior), and cells that are a
+          mine in all of them or in none are flagged or revealed, interior cells in bulk.
+          Returns True if it settled anything."""
+          self.sync_engine()
+          view = self.engine.view
+          unknown = view.count(COVERED)
+          if not unknown or unknown > self.endgame_unknowns:
+               return False
+          solved = []
+          for variables, constraints in self.engine.components():
+               result = self.engine.solve(variables, constraints)
+               if result is None:
+                    return False  # not exact, leave it to guessing
+               solved.append((variables, result))
+          frontier = {v for variables, _ in solved for v in variables}
+          interior = [i for i in range(len(view)) if view[i] == COVERED and i not in frontier]
+          remaining = self.board.bomb_count - view.count(FLAGGED) - view.count(MINE)
+          combined = combine_weights(solved, len(interior), remaining)
+          if combined is None:
+               return False
+          weights, total, interior_mines = combined
+
+          mines = [v for v, w in weights.items() if w == total]
+          safe = [v for v, w in weights.items() if w == 0]
+          if interior_mines == 0:
+               safe.extend(interior)
+          elif interior_mines == total * len(interior):
+               mines.extend(interior)
+          if not mines and not safe:
+               return False
+          cause = (RULE_COUNT, remaining, tuple(i for i in range(len(view)) if view[i] == COVERED))
+          w = self.board.width
+          for v in mines:
+               self.flagCell(self.board.grid[v // w][v % w], cause)
+          for v in safe:
+               self.revealCell(self.board.grid[v // w][v % w], cause)
+          return True
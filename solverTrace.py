@@ -1,67 +1,135 @@
-import copy
-from solverCore import Solver
+import time
+from collections import Counter
+from generator import COVERED
+from solverCore import Solver, RULE_SINGLE, RULE_SUBSET, RULE_CSP, RULE_PATTERN, RULE_COUNT
 
 
 class SolverStep:
      """Represents one step in the solving process"""
-     def __init__(self, board_state, action_type, cell_xy=None, description=""):
-          self.board_state = board_state  # snapshot of board
+     def __init__(self, delta, action_type, cell_xy=None, description="", cause=None):
+          self.delta = delta              # tuple of (index, old code, new code) changed by this step
           self.action_type = action_type  # "flag", "reveal", "analyze", "init", "complete"
           self.cell_xy = cell_xy          # (x, y) tuple (IMPORTANT: not a Cell object)
           self.description = description
+          self.cause = cause              # rule that fired for flag/reveal steps (see solverCore RULE_*)
+
+
+def describe_cause(cause, width):
+     """Readable text for a cause tuple (cell indices are y * width + x)"""
+     if cause is None:
+          return ""
+     xy = lambda i: (i % width, i // width)
+     if cause[0] == RULE_SINGLE:
+          return f"single-cell rule on {xy(cause[1])}"
+     if cause[0] == RULE_SUBSET:
+          return f"subset rule A={xy(cause[1])}, B={xy(cause[2])}, |D|={len(cause[3])}"
+     if cause[0] == RULE_CSP:
+          return f"enumeration of a {len(cause[1])}-cell component"
+     if cause[0] == RULE_PATTERN:
+          return "pattern of " + "-".join(str(xy(i)) for i in cause[1])
+     if cause[0] == RULE_COUNT:
+          return f"mine count: {cause[1]} left in {len(cause[2])} unknown cells"
+     return f"rule {cause[0]}"
+
+
+def cause_counts(steps, counts=None):
+     """Tally flag/reveal steps per (rule id, cell index of A) for the single-cell and subset rules,
+     and per (rule id, None) for the others, which have no cell A; pass counts to aggregate many traces"""
+     if counts is None:
+          counts = Counter()
+     for step in steps:
+          if step.cause is not None:
+               rule = step.cause[0]
+               counts[rule, step.cause[1] if rule in (RULE_SINGLE, RULE_SUBSET) else None] += 1
+     return counts
+
+
+class Timeline:
+     """Keyframe + delta index over a trace so any step can be rebuilt in at most `interval` deltas.
+
+     state(i) is the board after steps[0..i] (state(-1) is the initial board).
+     keyframes[k] holds state(k * interval - 1).
+     """
+     def __init__(self, initial_codes, interval=None):
+          if interval is None:
+               # keep keyframe memory about the size of the deltas themselves
+               interval = max(64, len(initial_codes) // 32)
+          self.interval = interval
+          self.steps = []
+          self.keyframes = [bytearray(initial_codes)]
+          self.tail = bytearray(initial_codes)  # state after the last appended step
+
+     def __len__(self):
+          return len(self.steps)
+
+     def append(self, new_steps):
+          for step in new_steps:
+               for idx, old, new in step.delta:
+                    self.tail[idx] = new
+               self.steps.append(step)
+               if len(self.steps) % self.interval == 0:
+                    self.keyframes.append(bytearray(self.tail))
+
+     def state_at(self, i):
+          """Fresh bytearray of state(i)"""
+          k = (i + 1) // self.interval
+          state = bytearray(self.keyframes[k])
+          for j in range(k * self.interval, i + 1):
+               for idx, old, new in self.steps[j].delta:
+                    state[idx] = new
+          return state
 
 
 class TracedSolver(Solver):
-     def __init__(self, board):
-          super().__init__(board)
+     def __init__(self, board, **options):
+          super().__init__(board, **options)
           self.steps = []  # Record all steps
+          # board state before the first step; state at step i = initial_codes + deltas of steps[0..i]
+          self.initial_codes = board.view_codes()
 
-     def snapshot_board(self):
-          """Create a snapshot of current board state"""
-          snapshot = []
-          for y in range(self.board.height):
-               row = []
-               for x in range(self.board.width):
-                    cell = self.board.grid[y][x]
-
-                    num = cell.num
-                    # Normalize: bombs store num=None instead of "*"
-                    if num == '*':
-                         num = None
-
-                    row.append({
-                         'revealed': cell.revealed,
-                         'isFlagged': cell.isFlagged,
-                         'isBomb': cell.isBomb,   # keep if you want debug/optional reveal
-                         'num': cell.num          # keep as-is (GUI must handle '*' if it ever appears)
-                    })
-               snapshot.append(row)
-          return snapshot
-
-     def record_step(self, action_type, cell_xy=None, description=""):
-          board_snapshot = self.snapshot_board()
-          step = SolverStep(board_snapshot, action_type, cell_xy, description)
+     def record_step(self, action_type, cell_xy=None, description="", cause=None, delta=()):
+          step = SolverStep(delta, action_type, cell_xy, description, cause)
           self.steps.append(step)
 
      # ---- override "actions" to add recording, algorithm unchanged (super() does real work)
 
-     def flagCell(self, c):
-          super().flagCell(c)
-          self.record_step("flag", (c.x, c.y), f"Flagged cell at ({c.x}, {c.y})")
+     def flagCell(self, c, cause=None):
+          super().flagCell(c, cause)
+          delta = ((self.cell_index(c), COVERED, c.code),)
+          self.record_step("flag", (c.x, c.y), f"Flagged cell at ({c.x}, {c.y})", cause, delta)
 
-     def revealCell(self, c):
-          super().revealCell(c)
-          self.record_step("reveal", (c.x, c.y), f"Revealed cell at ({c.x}, {c.y})")
+     def revealCell(self, c, cause=None):
+          super().revealCell(c, cause)
+          delta = ((self.cell_index(c), COVERED, c.code),)
+          self.record_step("reveal", (c.x, c.y), f"Revealed cell at ({c.x}, {c.y})", cause, delta)
 
-     def analyseCell(self, cell):
-          self.record_step("analyze", (cell.x, cell.y), f"Analyzing cell at ({cell.x}, {cell.y})")
-          super().analyseCell(cell)
+     def analyseCell(self, cell, level=0):
+          rules = ", ".join(rule.name for rule in self.levels[level])
+          self.record_step("analyze", (cell.x, cell.y), f"Analyzing cell at ({cell.x}, {cell.y}) [{rules}]")
+          return super().analyseCell(cell, level)
 
      def initialize(self):
           self.record_step("init", description="Initial board state")
           super().initialize()
-          self.record_step("init", description=f"Found {len(self.outdated_q)} cells to analyze")
+          self.record_step("init", description=f"Found {len(self.pending)} cells to analyze")
 
      def run(self):
           super().run()
-          self.record_step("complete", description="Solving complete!")
\ No newline at end of file
+          self.finish()
+
+     def finish(self):
+          # call after driving step() by hand (run() calls it itself)
+          self.record_step("complete", description="Solving complete!")
+
+
+def trace_solver(board, solver_cls=Solver, **options):
+     """Run a traced solver_cls (any Solver subclass) on board; returns (initial codes, steps, seconds).
+     Module-level so it can run in a worker process."""
+     cls = solver_cls
+     if not issubclass(cls, TracedSolver):
+          cls = type('Traced' + solver_cls.__name__, (TracedSolver, solver_cls), {})
+     start = time.perf_counter()
+     solver = cls(board, **options)
+     solver.initialize()
+     solver.run()
+     return solver.initial_codes, solver.steps, time.perf_counter() - start
@@ -1,67 +1,194 @@
 import sys
-from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QGridLayout, QVBoxLayout, QHBoxLayout, QPushButton, QLabel)
-from PyQt6.QtGui import QIcon, QPixmap
-from PyQt6.QtCore import Qt, QSize
+import time
+import threading
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
+                             QSlider, QSpinBox)
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 
-from generator import Board
-from solverTrace import TracedSolver
+import resources
+from generator import Board, BOARD_PRESETS
+from solverTrace import TracedSolver, Timeline, describe_cause
+from solverProbability import ProbabilityEngine
+from boardWidget import BoardView, fit_cell_size
 
 
-class CellButton(QPushButton):
-     def __init__(self, x, y, parent=None):
+class SolverWorker(QThread):
+     """Builds the board and runs the TracedSolver off the GUI thread, streaming steps in batches"""
+     boardReady = pyqtSignal(object)  # initial view codes
+     stepsReady = pyqtSignal(list)    # newly recorded SolverSteps
+     solveDone = pyqtSignal()
+
+     BATCH_SECONDS = 0.05  # how often new steps are sent to the GUI
+
+     def __init__(self, width, height, bomb_count, first_click, parent=None):
           super().__init__(parent)
-          self.x = x
-          self.y = y
-          self.setFixedSize(40, 40)
-          self.setContentsMargins(0, 0, 0, 0)
-          self.setStyleSheet("""
-               QPushButton {
-                    background-color: transparent;
-                    border: none;
-                    padding: 0px;
-                    margin: 0px;
-                    font-size: 16px;
-                    font-weight: bold;
-               }
-          """)
+          self.params = (width, height, bomb_count, first_click)
+
+     def run(self):
+          board = Board(*self.params)
+          solver = TracedSolver(board)
+          self.boardReady.emit(solver.initial_codes)
+          solver.initialize()
+
+          sent = 0
+          last = 0.0  # send the first step straight away
+          while solver.step():
+               if self.isInterruptionRequested():
+                    return  # stale job, "New Board" was pressed again
+               if time.monotonic() - last >= self.BATCH_SECONDS:
+                    self.stepsReady.emit(solver.steps[sent:])
+                    sent = len(solver.steps)
+                    last = time.monotonic()
+          solver.finish()
+          self.stepsReady.emit(solver.steps[sent:])
+          self.solveDone.emit()
+
+
+class ProbabilityWorker(QThread):
+     """Computes mine probabilities off the GUI thread; only the newest request is kept"""
+     resultReady = pyqtSignal(object, object)  # request key, (dict index -> p, interior p)
+
+     def __init__(self, width, height, bomb_count, parent=None):
+          super().__init__(parent)
+          self.engine = ProbabilityEngine(width, height, bomb_count)
+          self.cond = threading.Condition()
+          self.pending = None  # (key, view, changed indices or None)
+
+     def request(self, key, view, changed):
+          """changed: indices that differ from the previously requested view, None if unknown"""
+          with self.cond:
+               if self.pending is not None:
+                    # the skipped request's changes still have to reach the engine
+                    old_changed = self.pending[2]
+                    if old_changed is None or changed is None:
+                         changed = None
+                    else:
+                         changed = set(old_changed) | set(changed)
+               self.pending = (key, bytes(view), changed)
+               self.cond.notify()
+
+     def stop(self):
+          self.requestInterruption()
+          with self.cond:
+               self.cond.notify()
+          self.wait()
+
+     def run(self):
+          while True:
+               with self.cond:
+                    while self.pending is None and not self.isInterruptionRequested():
+                         self.cond.wait()
+                    if self.isInterruptionRequested():
+                         return
+                    key, view, changed = self.pending
+                    self.pending = None
+               self.resultReady.emit(key, self.engine.update(view, changed))
 
 
 class SolverVisualizerGUI(QMainWindow):
-     def __init__(self):
+     def __init__(self, width=10, height=10, bomb_count=15):
           super().__init__()
           self.setWindowTitle('MindSweeper Solver')
 
           # Load icon
           import os
           if os.path.exists('Icon.png'):
-               self.setWindowIcon(QIcon('Icon.png'))
+               self.setWindowIcon(resources.icon('Icon.png'))
 
           # Parameters
-          self.width = 10
-          self.height = 10
-          self.bomb_count = 15
-          self.first_click = (5, 5)
+          self.width = width
+          self.height = height
+          self.bomb_count = bomb_count
+          self.first_click = (width // 2, height // 2)
 
           self.current_step = 0
-          self.buttons = {}
-          self.cell_pixmap = QPixmap('preview.png')
+          self.timeline = None  # keyframe index over the steps received so far
+          self.steps = []       # steps received so far from the worker (timeline.steps)
+          self.solving = False
+          self.worker = None
+
+          # autoplay: the shown step follows the wall clock, so slow frames are skipped, not queued
+          self.play_timer = QTimer(self)
+          self.play_timer.setInterval(16)
+          self.play_timer.timeout.connect(self.on_play_tick)
+          self.play_origin = (0.0, 0)  # (time, step) playback is measured from
+
+          # mine-probability heatmap, cached per step
+          self.heat_cache = {}
+          self.heat_step = None  # last step sent to the probability worker
+          self.board_id = 0      # tells results for an old board apart
+          self.prob_worker = ProbabilityWorker(width, height, bomb_count, self)
+          self.prob_worker.resultReady.connect(self.on_heat_ready)
+          self.prob_worker.start()
 
           self.setup_ui()  # creates step_label, buttons, etc.
-          self.new_board()  # builds board+solver and calls display_step()
+          self.new_board()  # starts the solver worker; steps are displayed as they arrive
 
      def new_board(self):
+          # cancel the stale job, its late signals are ignored below
+          if self.worker is not None:
+               self.worker.requestInterruption()
+          self.stop_play()
           self.current_step = 0
-          self.board = Board(self.width, self.height, self.bomb_count, self.first_click)
-          self.solver = TracedSolver(self.board)
-          # Run solver to collect all steps
-          self.solver.initialize()
-          self.solver.run()
+          self.timeline = None
+          self.steps = []
+          self.solving = True
+          self.shown_step = -1
+          self.heat_cache = {}
+          self.heat_step = None
+          self.board_id += 1
+
+          self.worker = SolverWorker(self.width, self.height, self.bomb_count, self.first_click, self)
+          self.worker.boardReady.connect(self.on_board_ready)
+          self.worker.stepsReady.connect(self.on_steps_ready)
+          self.worker.solveDone.connect(self.on_solve_done)
+          self.worker.finished.connect(self.on_worker_finished)
+          self.worker.finished.connect(self.worker.deleteLater)
+          self.worker.start()
           self.display_step()
 
+     def on_board_ready(self, initial_codes):
+          if self.sender() is not self.worker:
+               return
+          # the view starts at the initial board; shown_step is the last step applied to it
+          self.timeline = Timeline(initial_codes)
+          self.steps = self.timeline.steps
+          self.board_view.set_codes(initial_codes)
+          self.shown_step = -1
+
+     def on_steps_ready(self, new_steps):
+          if self.sender() is not self.worker:
+               return
+          first = not self.steps
+          self.timeline.append(new_steps)
+          if first:
+               self.display_step()
+          else:
+               self.update_labels()
+
+     def on_solve_done(self):
+          if self.sender() is not self.worker:
+               return
+          self.solving = False
+          self.update_labels()
+
+     def on_worker_finished(self):
+          # the thread object is deleted after this, so stop referring to it
+          if self.sender() is self.worker:
+               self.worker = None
+
+     def closeEvent(self, event):
+          if self.worker is not None:
+               self.worker.requestInterruption()
+               self.worker.wait()
+          self.prob_worker.stop()
+          super().closeEvent(event)
+
      def setup_ui(self):
 
           # Central widget
           central_widget = QWidget()
+          central_widget.setStyleSheet(resources.BUTTON_STYLE)  # parsed once for all buttons
           self.setCentralWidget(central_widget)
 
           # Main layout
@@ -105,70 +232,29 @@ class SolverVisualizerGUI(QMainWindow):
           self.desc_label.setWordWrap(True)
           main_layout.addWidget(self.desc_label)
 
-          # Grid layout
-          grid_layout = QGridLayout()
-          grid_layout.setSpacing(0)
-          grid_layout.setContentsMargins(0, 0, 0, 0)
-
-          grid_container = QWidget()
-          grid_container.setLayout(grid_layout)
-          main_layout.addWidget(grid_container, alignment=Qt.AlignmentFlag.AlignCenter)
-
-          # Create grid buttons
-          for y in range(self.height):
-               for x in range(self.width):
-                    btn = CellButton(x, y)
-                    btn.setEnabled(False)  # Not clickable in visualizer
-
-                    if not self.cell_pixmap.isNull():
-                         scaled = self.cell_pixmap.scaled(40, 40, Qt.AspectRatioMode.IgnoreAspectRatio,
-                                                       Qt.TransformationMode.SmoothTransformation)
-                         btn.setIcon(QIcon(scaled))
-                         btn.setIconSize(QSize(40, 40))
-
-                    grid_layout.addWidget(btn, y, x)
-                    self.buttons[(x, y)] = btn
+          # Board widget (not clickable in visualizer); scroll with the wheel, Ctrl + wheel zooms
+          self.board_scroll = BoardView(self.width, self.height, fit_cell_size(self.width, self.height, 40))
+          self.board_view = self.board_scroll.board
+          board_layout = QHBoxLayout()
+          board_layout.addWidget(self.board_scroll, 1)
+          board_layout.addWidget(self.board_scroll.minimap, alignment=Qt.AlignmentFlag.AlignTop)
+          main_layout.addLayout(board_layout, 1)
 
           # Navigation controls
           nav_layout = QHBoxLayout()
           
-          NAV_BTN = """
-          QPushButton {
-          background-color: #cfcfcf;
-          border-top: 3px solid #ffffff;
-          border-left: 3px solid #ffffff;
-          border-right: 3px solid #7a7a7a;
-          border-bottom: 3px solid #7a7a7a;
-          padding: 8px 12px;
-          font-size: 15px;
-          font-weight: 700;
-          }
-          QPushButton:pressed {
-          border-top: 3px solid #7a7a7a;
-          border-left: 3px solid #7a7a7a;
-          border-right: 3px solid #ffffff;
-          border-bottom: 3px solid #ffffff;
-          }
-          QPushButton:disabled {
-          color: #9a9a9a;
-          }
-          """
 
           self.prev_btn = QPushButton('← Previous')
           self.prev_btn.clicked.connect(self.prev_step)
-          self.prev_btn.setStyleSheet(NAV_BTN)
 
           self.next_btn = QPushButton('Next →')
           self.next_btn.clicked.connect(self.next_step)
-          self.next_btn.setStyleSheet(NAV_BTN)
 
           self.reset_btn = QPushButton('Reset')
           self.reset_btn.clicked.connect(self.reset_steps)
-          self.reset_btn.setStyleSheet(NAV_BTN)
 
           self.new_btn = QPushButton('New Board')
           self.new_btn.clicked.connect(self.new_board)
-          self.new_btn.setStyleSheet(NAV_BTN)
 
           nav_layout.addWidget(self.prev_btn)
           nav_layout.addWidget(self.reset_btn)
@@ -177,109 +263,187 @@ class SolverVisualizerGUI(QMainWindow):
 
           main_layout.addLayout(nav_layout)
 
+          # Timeline: scrub to any step, or play it back at a set speed
+          timeline_layout = QHBoxLayout()
+
+          self.play_btn = QPushButton('Play')
+          self.play_btn.clicked.connect(self.toggle_play)
+
+          self.slider = QSlider(Qt.Orientation.Horizontal)
+          self.slider.setRange(0, 0)
+          self.slider.valueChanged.connect(self.on_slider)
+
+          self.speed_box = QSpinBox()
+          self.speed_box.setRange(1, 100000)
+          self.speed_box.setValue(20)
+          self.speed_box.setSuffix(' steps/s')
+          self.speed_box.valueChanged.connect(self.restart_clock)
+
+          self.heat_btn = QPushButton('Heatmap')
+          self.heat_btn.setCheckable(True)
+          self.heat_btn.toggled.connect(self.refresh_heat)
+
+          timeline_layout.addWidget(self.play_btn)
+          timeline_layout.addWidget(self.slider, 1)
+          timeline_layout.addWidget(self.speed_box)
+          timeline_layout.addWidget(self.heat_btn)
+
+          main_layout.addLayout(timeline_layout)
+
      def display_step(self):
           """Display the current step"""
 
-          if self.current_step >= len(self.solver.steps):
-               self.current_step = len(self.solver.steps) - 1
+          if not self.steps:
+               self.step_label.setText("Solving...")
+               self.desc_label.setText("")
+               self.board_view.set_highlight(None)
+               self.prev_btn.setEnabled(False)
+               self.next_btn.setEnabled(False)
+               return
+
+          if self.current_step >= len(self.steps):
+               self.current_step = len(self.steps) - 1
           if self.current_step < 0:
                self.current_step = 0
 
-          step = self.solver.steps[self.current_step]
+          step = self.steps[self.current_step]
 
           # Update labels
-          self.step_label.setText(f"Step {self.current_step + 1} / {len(self.solver.steps)}")
-          self.desc_label.setText(step.description)
-
-          # Update board display
-          for y in range(self.height):
-               for x in range(self.width):
-                    cell_state = step.board_state[y][x]
-                    btn = self.buttons[(x, y)]
-
-                    # Check if this is the highlighted cell
-                    is_highlighted = (step.cell_xy == (x, y))
-
-                    if cell_state['isFlagged']:
-                         btn.setIcon(QIcon())
-                         btn.setText('🚩')
-                         highlight_color = '#ffaa00' if is_highlighted else '#ffcc00'
-                         btn.setStyleSheet(f"""
-                         QPushButton {{
-                              background-color: {highlight_color};
-                              border: 2px solid #ff8800;
-                              font-size: 16px;
-                              padding: 0px;
-                              margin: 0px;
-                         }}
-                         """)
-                    elif cell_state['revealed']:
-                         btn.setIcon(QIcon())
-                         num = cell_state['num']
-
-                         if num == 0:
-                              btn.setText('')
-                         else:
-                              btn.setText(str(num))
-                              
-                         colors = {
-                         1: '#0000ff', 2: '#008000', 3: '#ff0000',
-                         4: '#000080', 5: '#800000', 6: '#008080',
-                         7: '#000000', 8: '#808080'
-                         }
-                         highlight_color = '#b0e0b0' if is_highlighted else '#d4d4d4'
-                         border = '3px solid #00aa00' if is_highlighted else '1px solid #888'
-                         btn.setStyleSheet(f"""
-                         QPushButton {{
-                         background-color: {highlight_color};
-                         border: {border};
-                         color: {colors.get(num, '#000000')};
-                         font-size: 18px;
-                         font-weight: bold;
-                         padding: 0px;
-                         margin: 0px;
-                         }}
-                         """)
-                    else:
-                         # Unknown cell
-                         btn.setText('')
-                         if not self.cell_pixmap.isNull():
-                              scaled_pixmap = self.cell_pixmap.scaled(40, 40, Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.SmoothTransformation)
-                              btn.setIcon(QIcon(scaled_pixmap))
-                              btn.setIconSize(QSize(40, 40))
-                              
-                              border = '3px solid #00aa00' if is_highlighted else 'none'
-                              btn.setStyleSheet(f"""
-                              QPushButton {{
-                                   background-color: transparent;
-                                   border: {border};
-                                   padding: 0px;
-                                   margin: 0px;
-                              }}
-                              """)
+          self.update_labels()
+          if step.cause is not None:
+               self.desc_label.setText(f"{step.description} ({describe_cause(step.cause, self.width)})")
+          else:
+               self.desc_label.setText(step.description)
+
+          # Update board display (only the cells changed between the shown step and this one)
+          self.apply_deltas(self.current_step)
+          self.board_view.set_highlight(step.cell_xy)
+          self.refresh_heat()
+
+     def update_labels(self):
+          total = f"{len(self.steps)} (solving...)" if self.solving else f"{len(self.steps)}"
+          self.step_label.setText(f"Step {self.current_step + 1} / {total}")
 
           # Update button states
           self.prev_btn.setEnabled(self.current_step > 0)
-          self.next_btn.setEnabled(self.current_step < len(self.solver.steps) - 1)
+          self.next_btn.setEnabled(self.current_step < len(self.steps) - 1)
+
+          self.slider.blockSignals(True)
+          self.slider.setMaximum(max(0, len(self.steps) - 1))
+          self.slider.setValue(self.current_step)
+          self.slider.blockSignals(False)
+
+     def apply_deltas(self, target):
+          steps = self.steps
+          # far jumps rebuild from the nearest keyframe instead of replaying every delta in between
+          if abs(target - self.shown_step) > self.timeline.interval:
+               self.board_view.set_codes(self.timeline.state_at(target), self.board_view.highlight)
+               self.shown_step = target
+               return
+          changes = {}
+          if target > self.shown_step:
+               for i in range(self.shown_step + 1, target + 1):
+                    for idx, old, new in steps[i].delta:
+                         changes[idx] = new
+          else:
+               for i in range(self.shown_step, target, -1):
+                    for idx, old, new in reversed(steps[i].delta):
+                         changes[idx] = old
+          self.board_view.set_cells(changes.items())
+          self.shown_step = target
+
+     # ---- probability heatmap
+
+     def refresh_heat(self):
+          if not self.heat_btn.isChecked() or not self.steps:
+               self.board_view.set_heat(None)
+               return
+          step = self.current_step
+          if step in self.heat_cache:
+               self.board_view.set_heat(self.heat_cache[step])
+               return
+
+          # the worker's engine is incremental: tell it which cells changed since its last view
+          changed = None
+          if self.heat_step is not None and abs(step - self.heat_step) <= self.timeline.interval:
+               lo, hi = sorted((step, self.heat_step))
+               changed = [idx for i in range(lo + 1, hi + 1) for idx, old, new in self.steps[i].delta]
+          self.heat_step = step
+          self.prob_worker.request((self.board_id, step), self.board_view.codes, changed)
+
+     def on_heat_ready(self, key, heat):
+          board_id, step = key
+          if board_id != self.board_id:
+               return
+          if len(self.heat_cache) >= 4096:
+               del self.heat_cache[next(iter(self.heat_cache))]
+          self.heat_cache[step] = heat
+          if step == self.current_step and self.heat_btn.isChecked():
+               self.board_view.set_heat(heat)
 
      def next_step(self):
-          if self.current_step < len(self.solver.steps) - 1:
+          if self.current_step < len(self.steps) - 1:
                self.current_step += 1
                self.display_step()
+               self.restart_clock()
 
      def prev_step(self):
           if self.current_step > 0:
                self.current_step -= 1
                self.display_step()
+               self.restart_clock()
 
      def reset_steps(self):
           self.current_step = 0
           self.display_step()
+          self.restart_clock()
+
+     def on_slider(self, value):
+          if value != self.current_step:
+               self.current_step = value
+               self.display_step()
+               self.restart_clock()
+
+     # ---- autoplay
+
+     def toggle_play(self):
+          if self.play_timer.isActive():
+               self.stop_play()
+               return
+          if not self.steps:
+               return
+          if self.current_step >= len(self.steps) - 1 and not self.solving:
+               self.current_step = 0
+               self.display_step()
+          self.restart_clock()
+          self.play_timer.start()
+          self.play_btn.setText('Pause')
+
+     def stop_play(self):
+          self.play_timer.stop()
+          self.play_btn.setText('Play')
+
+     def restart_clock(self):
+          self.play_origin = (time.monotonic(), self.current_step)
+
+     def on_play_tick(self):
+          t0, s0 = self.play_origin
+          target = s0 + int((time.monotonic() - t0) * self.speed_box.value())
+          last = len(self.steps) - 1
+          if target >= last:
+               target = last
+               if not self.solving:
+                    self.stop_play()
+          if target != self.current_step:
+               self.current_step = target
+               self.display_step()
 
 
-def main():
+def main(preset='small'):
+     # preset: a BOARD_PRESETS name or a (width, height, bomb_count) tuple
      app = QApplication(sys.argv)
-     window = SolverVisualizerGUI()
+     size = BOARD_PRESETS[preset] if isinstance(preset, str) else preset
+     window = SolverVisualizerGUI(*size)
      window.show()
      sys.exit(app.exec())
 